@@ -1,36 +1,230 @@
 import tkinter as tk
 from tkinter import font as tkFont, colorchooser, filedialog
-from PIL import Image, ImageDraw, ImageFont, ImageTk
-from threading import Event
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from threading import Condition, Event, RLock, Thread
+from collections import deque, namedtuple
+from bisect import bisect_left, bisect_right
+from array import array
+import queue
+import heapq
+import itertools
 import time
+import math
+import re
 import os
-import winreg
-from fontTools.ttLib import TTFont
-
-def get_font_path_from_registry(font_name):
+import argparse
+import shutil
+import struct
+import zlib
+import sys
+import json
+from functools import lru_cache
+from abc import ABC, abstractmethod
+from stat import S_ISSOCK
+# 시작 시간을 줄이기 위해 fontTools, PIL.ImageTk, winreg, asyncio, multiprocessing, concurrent.futures는 처음 쓰는 곳에서 가져옴
+
+def import_winreg():
     """
-    레지스트리에서 폰트 경로를 가져옵니다.
+    winreg 모듈을 처음 필요할 때 가져옵니다. 윈도가 아니면 None을 반환합니다.
     """
-    font_path = None
     try:
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Fonts") as key:
-            for i in range(0, winreg.QueryInfoKey(key)[1]):
-                font, path = winreg.EnumValue(key, i)[:2]
-                if font_name.lower() in font.lower():
-                    font_path = path
-                    break
-    except Exception as e:
-        print(f"Error reading registry: {e}")
+        import winreg
+    except ImportError:  # 윈도가 아닌 환경 (렌더링 벤치마크 등)
+        return None
+    return winreg
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+# 찾는 폰트(기본값 "arial")가 없을 때 차례로 쓰는 산세리프 글꼴
+FALLBACK_FONT_FAMILIES = ("Arial", "DejaVu Sans", "Liberation Sans", "Noto Sans", "FreeSans", "Malgun Gothic")
+
+def font_key(name):
+    # 색인 키: 대소문자와 공백을 무시 ("DejaVu Sans" == "DejaVuSans")
+    return name.lower().replace(" ", "")
 
-    if font_path and not os.path.isabs(font_path):
-        font_path = os.path.join(os.environ['WINDIR'], 'Fonts', font_path)
+REGULAR_STYLES = {"regular", "book", "normal", "roman", "standard"}
 
-    return font_path
+def style_rank(style):
+    # 같은 글꼴 이름을 가진 파일 중 Regular 같은 기본 굵기를 먼저 (0), 나머지는 1
+    styles = (style or "").split(",")
+    return 0 if any(font_key(s) in REGULAR_STYLES for s in styles) else 1
+
+class FontBackend(ABC):
+    """
+    설치된 폰트의 (이름, 파일 경로)를 한 번만 훑어 이름 -> 경로 색인을 만듭니다.
+    정확한 이름은 dict로 O(1), 앞부분 일치는 정렬된 이름 목록에서 bisect로 O(log n)에 찾으므로
+    그리기 도중에 레지스트리나 폰트 폴더를 다시 훑지 않습니다. scan()은 플랫폼별 하위 클래스에서 구현합니다.
+    """
+    def __init__(self):
+        self.index = None  # {font_key(이름): 경로}
+        self.names = []  # 정렬된 색인 키
+        self.files = []  # 찾은 순서대로 중복 없는 폰트 파일 경로
+
+    @abstractmethod
+    def scan(self):
+        """
+        (글꼴 이름, 파일 경로)를 차례로 돌려줍니다.
+        같은 이름은 먼저 나온 경로가 색인되므로, 더 알맞은 항목(기본 굵기의 글꼴 이름, 그다음 다른 굵기, 마지막으로 파일 이름)을 먼저 돌려줍니다.
+        """
+
+    def refresh(self):
+        index = {}
+        files = {}
+        for name, path in self.scan():
+            index.setdefault(font_key(name), path)
+            files.setdefault(path, None)
+        # 폰트 대화상자의 작업 스레드에서 다시 만들 수 있으므로 새 객체를 만든 뒤 한 번에 바꿔 끼움
+        self.files = list(files)
+        self.names = sorted(index)
+        self.index = index
+
+    def find(self, font_name):
+        """
+        이름이 정확히 같은 폰트, 없으면 이름이 font_name으로 시작하는 폰트, 그래도 없으면 이름에 font_name이 들어간 폰트의 경로를 반환합니다.
+        """
+        if self.index is None:
+            self.refresh()
+        index, names = self.index, self.names
+        key = font_key(font_name)
+        if key in index:
+            return index[key]
+        i = bisect_left(names, key)
+        if i < len(names) and names[i].startswith(key):
+            return index.get(names[i])
+        for name in names:  # 예전처럼 부분 일치 (결과는 get_font_path_from_registry에서 캐시됨)
+            if key in name:
+                return index.get(name)
+        return None
+
+    def fallback(self):
+        # 기본 산세리프 글꼴 중 설치된 첫 번째, 없으면 아무 폰트 파일이나 (그래도 없으면 None)
+        if self.index is None:
+            self.refresh()
+        for family in FALLBACK_FONT_FAMILIES:
+            path = self.index.get(font_key(family))
+            if path:
+                return path
+        files = self.font_files()
+        return files[0] if files else None
+
+    def font_files(self):
+        if self.index is None:
+            self.refresh()
+        return [path for path in self.files if path.lower().endswith(('.ttf', '.otf'))]
+
+class RegistryFontBackend(FontBackend):
+    """
+    윈도: Fonts 레지스트리 키(컴퓨터, 사용자)와 사용자 폰트 폴더에서 폰트를 찾습니다.
+    """
+    def scan(self):
+        winreg = import_winreg()
+        for hive in (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER):
+            try:
+                with winreg.OpenKey(hive, r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Fonts") as key:
+                    for i in range(0, winreg.QueryInfoKey(key)[1]):
+                        font, path = winreg.EnumValue(key, i)[:2]
+                        if '@' in font:  # 세로쓰기 폰트 제외
+                            continue
+                        if not os.path.isabs(path):
+                            path = os.path.join(os.environ['WINDIR'], 'Fonts', path)
+                        # "Malgun Gothic & Malgun Gothic Semilight (TrueType)" -> 이름 두 개
+                        for name in re.sub(r"\s*\([^)]*\)$", "", font).split(" & "):
+                            yield name, path
+            except OSError as e:
+                if hive == winreg.HKEY_LOCAL_MACHINE:
+                    print(f"Error reading registry: {e}")
+
+        # 사용자 폴더에서 폰트 가져오기
+        font_folder = os.path.join(os.getenv('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts')
+        if os.path.exists(font_folder):
+            for file in os.listdir(font_folder):
+                if file.lower().endswith(FONT_EXTENSIONS):
+                    yield os.path.splitext(file)[0], os.path.join(font_folder, file)
+
+class DirectoryFontBackend(FontBackend):
+    """
+    리눅스/맥: fontconfig(fc-list)가 있으면 그 글꼴 이름 목록을, 없으면 XDG 데이터 폴더, fontconfig 설정(/etc/fonts/fonts.conf)의 <dir>,
+    맥 기본 폰트 폴더를 훑어 각 파일의 name 테이블에서 읽은 글꼴 이름(한글 이름)으로 색인합니다.
+    읽은 이름은 폰트 정보 캐시에 저장되므로 다음 실행부터는 바뀐 파일만 읽습니다.
+    한 글꼴 이름에 파일이 여럿이면(Regular, Bold ...) Regular 파일을 색인하고, 파일 이름은 글꼴 이름이 차지하지 않은 키에만 색인합니다.
+    """
+    def font_dirs(self):
+        home = os.path.expanduser('~')
+        data_home = os.getenv('XDG_DATA_HOME') or os.path.join(home, '.local', 'share')
+        data_dirs = (os.getenv('XDG_DATA_DIRS') or '/usr/local/share:/usr/share').split(':')
+        dirs = [os.path.join(base, 'fonts') for base in [data_home] + data_dirs if base]
+        dirs.append(os.path.join(home, '.fonts'))
+        try:
+            with open('/etc/fonts/fonts.conf', encoding='utf-8') as f:
+                dirs += [os.path.expanduser(d.strip()) for d in re.findall(r"<dir[^>]*>([^<]+)</dir>", f.read())]
+            dirs = [d for d in dirs if os.path.isabs(d)]  # prefix="xdg" 같은 상대 경로는 위 XDG 폴더로 이미 포함됨
+        except OSError:
+            pass
+        if sys.platform == 'darwin':
+            dirs += ['/System/Library/Fonts', '/Library/Fonts', os.path.join(home, 'Library', 'Fonts')]
+        return list(dict.fromkeys(dirs))
+
+    def scan_fontconfig(self):
+        # fc-list가 없거나 실패하면 None
+        import subprocess
+        try:
+            output = subprocess.run(["fc-list", "--format", "%{family}\t%{style}\t%{file}\n"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            return None
+        fonts = []
+        for line in output.splitlines():
+            parts = line.split("\t")
+            if len(parts) != 3 or not parts[2].lower().endswith(FONT_EXTENSIONS):
+                continue
+            families, style, path = parts
+            fonts += [(style_rank(style), path, family) for family in families.split(",") if family]
+        return fonts or None
+
+    def scan(self):
+        fonts = self.scan_fontconfig()
+        if fonts is None:
+            with font_scan_lock:
+                fonts = list(self.scan_directories())
+        for _, path, name in sorted(fonts):
+            yield name, path
+        for path in sorted({path for _, path, _ in fonts}):
+            yield os.path.splitext(os.path.basename(path))[0], path
+
+    def scan_directories(self):
+        # (style_rank, 경로, 이름)
+        cache = get_font_metadata_cache()
+        for folder in self.font_dirs():
+            for root, _, files in os.walk(folder):
+                for file in sorted(files):
+                    if not file.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, file)
+                    key, info = cache.lookup(path)
+                    if info is None:
+                        info = cache.store(path, key or [0, 0], *read_font_names(path))
+                    korean_name, family_name, _, style = info
+                    for name in (korean_name, family_name):
+                        if name:
+                            yield style_rank(style), path, name
+        cache.save()
+
+@lru_cache(maxsize=1)
+def get_font_backend():
+    return RegistryFontBackend() if import_winreg() is not None else DirectoryFontBackend()
+
+@lru_cache(maxsize=32)
+def get_font_path_from_registry(font_name):
+    """
+    폰트 이름으로 폰트 파일 경로를 가져옵니다. (윈도는 레지스트리, 그 외에는 폰트 폴더 색인)
+    설치되어 있지 않으면 기본 산세리프 글꼴(FALLBACK_FONT_FAMILIES)의 경로를 반환합니다.
+    """
+    backend = get_font_backend()
+    return backend.find(font_name) or backend.fallback()
 
 def get_korean_font_name(font_path):
     """
     폰트 파일에서 한글 이름을 가져옵니다.
     """
+    from fontTools.ttLib import TTFont
     try:
         font = TTFont(font_path)
         for record in font['name'].names:
@@ -50,46 +244,2026 @@ def get_font_name_from_file(font_path):
     except Exception as e:
         return os.path.basename(font_path).split('.')[0]
 
-def get_installed_fonts():
+def has_hangul(text):
+    return any('\uAC00' <= char <= '\uD7A3' for char in text)
+
+def read_font_names(font_path):
     """
-    레지스트리와 사용자 폴더에서 설치된 폰트 목록을 가져옵니다.
+    폰트 파일의 name 테이블을 한 번만 읽어 (한글 이름, 글꼴 이름, 스타일 이름)을 가져옵니다.
     """
-    fonts = []
-    font_folder = os.path.join(os.getenv('LOCALAPPDATA'), 'Microsoft', 'Windows', 'Fonts')
-    
-    # 레지스트리에서 폰트 가져오기
+    from fontTools.ttLib import TTFont  # 폰트 목록을 처음 읽을 때만 가져옴
+    korean_name = family_name = style = None
     try:
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Fonts") as key:
-            for i in range(0, winreg.QueryInfoKey(key)[1]):
-                font, path = winreg.EnumValue(key, i)[:2]
-                if '@' not in font and path.lower().endswith(('.ttf', '.otf')):  # 세로쓰기 폰트 및 불가능한 포맷 제외
-                    if not os.path.isabs(path):
-                        path = os.path.join(os.environ['WINDIR'], 'Fonts', path)
-                    font_name = get_korean_font_name(path) or get_font_name_from_file(path)
-                    fonts.append((font_name, path))
-    except Exception as e:
-        print(f"Error reading registry: {e}")
+        font = TTFont(font_path, lazy=True)  # name 테이블만 필요하므로 나머지 테이블은 읽지 않음
+        for record in font['name'].names:
+            if record.nameID not in (1, 2) or record.platformID != 3:
+                continue
+            if record.nameID == 2:  # 스타일 (Regular, Bold ...)
+                if record.langID == 1033 and style is None:
+                    style = record.toUnicode()
+            elif record.langID == 1042 and korean_name is None:  # Windows, Korean
+                korean_name = record.toUnicode()
+            elif record.langID == 1033 and family_name is None:  # Windows, English
+                family_name = record.toUnicode()
+    except Exception:
+        pass
+    return korean_name, family_name or get_font_name_from_file(font_path), style
+
+def get_config_dir():
+    """
+    설정 파일을 저장할 사용자 설정 폴더 경로를 반환합니다.
+    """
+    base = os.getenv('APPDATA') or os.getenv('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'Timer-for-stopwatch-and-countdown')
+
+def lock_state_dir(state_dir):
+    """
+    설정 폴더의 instance.lock에 배타적 잠금을 걸고 그 파일 디스크립터를 반환합니다 (닫을 때까지 잠금 유지).
+    다른 프로세스가 이미 잠갔으면 None. 같은 폴더의 저널과 설정 파일은 잠금을 가진 프로세스만 씁니다.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    fd = os.open(os.path.join(state_dir, 'instance.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:  # 윈도
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+class FontMetadataCache:
+    """
+    (경로, 수정 시각, 크기) -> (한글 이름, 글꼴 이름, 한글 포함 여부, 스타일 이름)을 디스크에 저장해 두는 캐시입니다.
+    다시 검색할 때는 새로 생기거나 바뀐 파일만 읽습니다.
+    """
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_config_dir(), 'font_cache.json')
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass  # 캐시가 없거나 깨졌으면 처음부터 다시 만듦
+
+    def lookup(self, font_path):
+        # 파일이 그대로일 때만 캐시 값을 돌려줌
+        try:
+            stat = os.stat(font_path)
+        except OSError:
+            return None, None
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = self.entries.get(font_path)
+        if entry and entry[:2] == key and len(entry) == 6:  # 스타일 이름이 없는 예전 항목은 다시 읽음
+            return key, tuple(entry[2:])
+        return key, None
+
+    def store(self, font_path, key, korean_name, family_name, style=None):
+        info = (korean_name, family_name, has_hangul(korean_name or family_name), style)
+        self.entries[font_path] = key + list(info)
+        self.dirty = True
+        return info
+
+    def prune(self, font_paths):
+        # 더 이상 설치되어 있지 않은 폰트는 캐시에서 지움
+        for path in set(self.entries) - set(font_paths):
+            del self.entries[path]
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Error writing font cache: {e}")
+
+@lru_cache(maxsize=1)
+def get_font_metadata_cache():
+    return FontMetadataCache()
+
+font_scan_lock = RLock()  # 폰트 정보 캐시를 채우는 검색은 한 번에 하나만 (같은 .tmp 파일로 저장하므로)
+
+def iter_font_files():
+    """
+    레지스트리(또는 폰트 폴더)와 사용자 폴더에서 설치된 폰트 파일 경로를 차례로 돌려줍니다.
+    폰트 목록을 새로 읽을 때마다 색인도 다시 만들어, 실행 중에 설치한 폰트도 찾을 수 있게 합니다.
+    """
+    backend = get_font_backend()
+    backend.refresh()
+    get_font_path_from_registry.cache_clear()
+    yield from backend.font_files()
+
+def font_sort_key(font):
+    # 한글 포함 글꼴 먼저, 그 안에서는 이름순
+    return (not font[2], font[0])
+
+def scan_installed_fonts(result_queue, batch_size=32, max_workers=4):
+    """
+    설치된 폰트 정보를 (이름, 경로, 한글 포함 여부) 묶음으로 result_queue에 차례로 넣습니다.
+    캐시에 있는 폰트를 먼저 보내고, 나머지는 스레드 풀에서 name 테이블만 읽어 보냅니다.
+    끝나면 None을 넣습니다. 백그라운드 스레드에서 실행하는 함수입니다.
+    """
+    with font_scan_lock:
+        scan_fonts(result_queue, batch_size, max_workers)
+    result_queue.put(None)
+
+def scan_fonts(result_queue, batch_size, max_workers):
+    cache = get_font_metadata_cache()
+    font_paths = list(iter_font_files())
+    batch = []
+    missing = []
+
+    def flush():
+        if batch:
+            result_queue.put(list(batch))
+            batch.clear()
+
+    for path in font_paths:
+        key, info = cache.lookup(path)
+        if info is None:
+            missing.append((path, key or [0, 0]))
+            continue
+        batch.append((info[0] or info[1], path, info[2]))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(read_font_names, path): (path, key) for path, key in missing}
+        for future in as_completed(futures):
+            path, key = futures[future]
+            korean_name, family_name, hangul, _ = cache.store(path, key, *future.result())  # 캐시는 이 스레드에서만 씀
+            batch.append((korean_name or family_name, path, hangul))
+            if len(batch) >= batch_size:
+                flush()
+    flush()
+
+    cache.prune(font_paths)
+    cache.save()
+
+@lru_cache(maxsize=32)
+def load_font(font_path, font_size, fallback=True):
+    """
+    폰트 파일을 한 번만 읽고 재사용합니다.
+    fallback이 False이면 읽지 못한 경우 기본 폰트 대신 예외를 그대로 냅니다.
+    """
+    try:
+        return ImageFont.truetype(font_path, font_size)
+    except (IOError, AttributeError):
+        if not fallback:
+            raise
+        try:
+            return ImageFont.load_default(font_size)  # 설치된 폰트가 하나도 없을 때도 크기는 지킴 (Pillow 10.1 이상)
+        except TypeError:
+            return ImageFont.load_default()
+
+OUTLINE_MODES = ("stroke", "dilate", "offset")
+
+def draw_outline_layer(size, origin, text, font, outline, thickness, mode="stroke"):
+    """
+    text의 외곽선 레이어를 그립니다.
+    stroke: Pillow의 stroke_width로 한 번에 그림
+    dilate: 글자를 마스크로 한 번 그린 뒤 두께만큼 흐리게(BoxBlur) 하고 0보다 큰 곳을 모두 채워 한 번에 팽창시킴
+    offset: 가로/세로로 조금씩 옮겨 가며 여러 번 그리는 기존 방식 (두께에 비례해 느리고 대각선에 틈이 생김)
+    """
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    if mode == "stroke":
+        ImageDraw.Draw(layer).text(origin, text, font=font, fill=outline, stroke_width=thickness, stroke_fill=outline)
+    elif mode == "dilate":
+        mask = Image.new("L", size, 0)
+        ImageDraw.Draw(mask).text(origin, text, font=font, fill=255)
+        # 반지름 두께의 상자 흐림에서 0이 아닌 곳 = (2*두께+1) 정사각형 팽창 (MaxFilter(3)을 두께만큼 반복하는 것과 거의 같고 두께와 무관하게 빠름)
+        mask = mask.filter(ImageFilter.BoxBlur(thickness)).point(lambda v: 255 if v else 0)
+        layer.paste(outline, (0, 0, size[0], size[1]), mask)
+    else:
+        draw = ImageDraw.Draw(layer)
+        for adj in range(-thickness, thickness+1):
+            draw.text((origin[0]+adj, origin[1]), text, font=font, fill=outline)
+            draw.text((origin[0], origin[1]+adj), text, font=font, fill=outline)
+    return layer
+
+ATLAS_CHARS = "0123456789:."
+
+@lru_cache(maxsize=64)
+def font_metrics(font_path, font_size):
+    """
+    (숫자 칸 폭, ATLAS_CHARS 전체의 위쪽 끝, 아래쪽 끝)을 반환합니다.
+    """
+    font = load_font(font_path, font_size)
+    boxes = [font.getbbox(ch) for ch in ATLAS_CHARS]
+    return max(font.getlength(d) for d in "0123456789"), min(box[1] for box in boxes), max(box[3] for box in boxes)
+
+def text_shape(text):
+    # 크기 계산에는 글자 수와 자리별 종류만 중요하므로 숫자를 모두 0으로 바꿔 캐시 적중률을 높임
+    return "".join("0" if ch.isdigit() else ch for ch in text)
+
+@lru_cache(maxsize=1024)
+def measure_text(font_path, font_size, thickness, text):
+    """
+    GlyphAtlas로 그렸을 때 text 한 줄이 차지하는 (폭, 높이)를 실제로 그리지 않고 계산합니다.
+    """
+    digit_advance, top, bottom = font_metrics(font_path, font_size)
+    font = load_font(font_path, font_size)
+    width = sum(round(digit_advance) if ch.isdigit() else round(font.getlength(ch)) for ch in text)
+    return width + 2 * thickness, bottom - top + 2 * thickness
+
+@lru_cache(maxsize=256)
+def fit_font_size(font_path, thickness, text, width, height, min_size=8, max_size=2000):
+    """
+    width x height 안에 text가 들어가는 가장 큰 글꼴 크기를 이진 탐색으로 찾습니다.
+    크기별 측정 결과(measure_text)와 탐색 결과가 모두 캐시되므로 같은 창 크기에서는 다시 계산하지 않습니다.
+    """
+    low, high = min_size, max_size
+    while low < high:
+        size = (low + high + 1) // 2
+        text_width, text_height = measure_text(font_path, size, thickness, text)
+        if text_width <= width and text_height <= height:
+            low = size
+        else:
+            high = size - 1
+    return low
+
+class GlyphAtlas:
+    """
+    외곽선이 들어간 숫자와 ':' 글리프를 한 번만 그려 두고, 매 프레임은 붙여 넣기로만 만듭니다.
+    외곽선과 글자를 따로 저장해 두었다가 외곽선을 모두 먼저 깔고 글자를 올립니다(기존 그리기 순서와 동일).
+    """
+    def __init__(self, font_path, font_size, fill, outline, thickness, outline_mode="stroke"):
+        self.font = load_font(font_path, font_size)
+        self.fill = fill
+        self.outline = outline
+        self.thickness = thickness
+        self.outline_mode = outline_mode
+
+        # 숫자는 같은 폭의 칸에 배치해 값이 바뀌어도 글자 위치가 흔들리지 않게 함
+        self.digit_advance, self.top, bottom = font_metrics(font_path, font_size)
+        self.height = bottom - self.top + 2 * thickness
+
+        self.glyphs = {}
+        for ch in ATLAS_CHARS:
+            self.glyph(ch)
+
+    def advance(self, ch):
+        if ch.isdigit():
+            return round(self.digit_advance)
+        return round(self.font.getlength(ch))
+
+    def glyph(self, ch):
+        # 아틀라스에 없는 글자는 처음 쓰일 때 한 번만 그려서 추가
+        if ch in self.glyphs:
+            return self.glyphs[ch]
+
+        left, _, right, _ = self.font.getbbox(ch)
+        advance = self.advance(ch)
+        shift = (advance - self.font.getlength(ch)) / 2 if ch.isdigit() else 0  # 칸 가운데 정렬
+        pad = self.thickness - min(left + shift, 0)
+        width = int(math.ceil(pad + max(right + shift, advance) + self.thickness))
+        origin = (pad + shift, self.thickness - self.top)
+
+        outline_layer = draw_outline_layer((width, self.height), origin, ch, self.font, self.outline, self.thickness, self.outline_mode)
+
+        fill_layer = Image.new("RGBA", (width, self.height), (0, 0, 0, 0))
+        ImageDraw.Draw(fill_layer).text(origin, ch, font=self.font, fill=self.fill)
+
+        self.glyphs[ch] = (outline_layer, fill_layer, int(round(pad)))
+        return self.glyphs[ch]
+
+@lru_cache(maxsize=16)
+def get_glyph_atlas(font_path, font_size, fill, outline, thickness, outline_mode="stroke"):
+    """
+    (폰트 경로, 크기, 글자 색, 외곽선 색, 두께, 외곽선 방식) 조합마다 하나의 글리프 아틀라스를 공유합니다.
+    """
+    return GlyphAtlas(font_path, font_size, fill, outline, thickness, outline_mode)
+
+# 표시 단위 이름 -> 소수점 아래 자릿수, 자릿수 -> 초당 화면 갱신 횟수
+DISPLAY_PRECISIONS = {"초 단위": 0, "1/10초": 1, "1/100초": 2}
+FRAME_RATES = {0: 1, 1: 30, 2: 60}
+
+def format_time(total_seconds, football_mode=False, decimals=0):
+    """
+    초 단위 시간 값을 화면에 표시할 문자열로 바꿉니다.
+    축구 모드에서는 시간 부분을 제외하고 분을 60 이상으로 표시합니다.
+    decimals가 1 또는 2이면 초 아래 자리(1/10초, 1/100초)를 내림해서 붙입니다.
+    """
+    fraction = ""
+    if decimals:
+        scale = 10 ** decimals
+        units = int(total_seconds * scale + 1e-9)  # 부동소수점 오차로 한 자리 덜 나오지 않도록 보정
+        total_seconds, rest = divmod(units, scale)
+        fraction = f".{rest:0{decimals}}"
+    minutes, seconds = divmod(int(total_seconds), 60)
+    if football_mode:
+        return f"{minutes:02}:{seconds:02}{fraction}"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02}:{minutes:02}:{seconds:02}{fraction}"
+
+# 렌더링에 필요한 스타일 설정 (Tk 위젯 값과 무관하게 비교/캐시할 수 있도록 튜플로 둠)
+TimerStyle = namedtuple("TimerStyle", [
+    "font_path", "font_size", "fill", "outline", "thickness",
+    "outline_enabled", "football_mode", "outline_mode", "size", "decimals",
+], defaults=(True, False, "stroke", (800, 200), 0))
+
+class TimerRenderer:
+    """
+    Tk 없이 시간 값과 스타일(TimerStyle)만으로 표시할 글자를 정하는 렌더러입니다.
+    그리기는 같은 스타일의 DigitCellRenderer(창)와 FramePipeline(미리 그리기)이 맡습니다.
+    """
+    def __init__(self, style):
+        self.style = style
+
+    def text_for(self, value):
+        # 문자열은 그대로, 숫자는 초 단위 시간으로 보고 변환
+        if isinstance(value, str):
+            return value
+        return format_time(value, self.style.football_mode, self.style.decimals)
 
-    # 사용자 폴더에서 폰트 가져오기
-    if os.path.exists(font_folder):
-        for file in os.listdir(font_folder):
-            if file.endswith(('.ttf', '.otf')):
-                font_path = os.path.join(font_folder, file)
-                font_name = get_korean_font_name(font_path) or get_font_name_from_file(font_path)
-                fonts.append((font_name, font_path))
+class DigitCellRenderer:
+    """
+    타이머 문자열을 글자별 고정 칸(셀)으로 나누어 그리고, 바뀐 칸만 다시 그리는 렌더러입니다.
+    frame은 style.size 크기의 전체 이미지이고, tiles는 셀 경계로 나눈 (x0, y0, x1, y1) 영역 목록입니다.
+    update()는 다시 올려야 하는 tiles의 번호만 돌려주므로, 보통 마지막 초 자리 한두 칸만 화면에 올리면 됩니다.
+    """
+    def __init__(self, style):
+        self.style = style
+        thickness = style.thickness if style.outline_enabled else 0
+        self.atlas = get_glyph_atlas(style.font_path, style.font_size, style.fill, style.outline, thickness, style.outline_mode)
+        self.frame = Image.new("RGBA", style.size, (0, 0, 0, 0))
+        self.text = None
+        self.placements = []  # 글자별 (글리프, 프레임 안 x 위치)
+        self.tiles = []
+
+    def same_layout(self, text):
+        # 글자 수와 자리별 폭이 같으면 셀 배치를 그대로 쓸 수 있음
+        return self.text is not None and len(text) == len(self.text) and all(
+            self.atlas.advance(a) == self.atlas.advance(b) for a, b in zip(self.text, text))
+
+    def layout(self, text):
+        atlas = self.atlas
+        width, height = self.frame.size
+        strip_width = sum(atlas.advance(ch) for ch in text) + 2 * atlas.thickness
+        self.origin = ((width - strip_width) // 2, (height - atlas.height) // 2)
+
+        self.placements = []
+        boundaries = []
+        pen_x = self.origin[0] + atlas.thickness
+        for ch in text:
+            glyph = atlas.glyph(ch)
+            self.placements.append((glyph, pen_x - glyph[2]))
+            boundaries.append(pen_x)
+            pen_x += atlas.advance(ch)
+
+        # 글자 칸 경계와 문자열 양 끝(외곽선 여백 포함)으로 나눔. 양옆의 빈 여백은 거의 다시 올릴 일이 없음
+        boundaries = boundaries[1:] + [self.origin[0], self.origin[0] + strip_width]
+        edges = sorted({0, width} | {min(max(x, 0), width) for x in boundaries})
+        self.tiles = [(x0, 0, x1, height) for x0, x1 in zip(edges, edges[1:])]
+
+    def redraw(self, x0, x1):
+        # [x0, x1) 세로 띠를 지우고 그 안에 걸치는 글리프만 외곽선 -> 글자 순서로 다시 합성
+        width, height = self.frame.size
+        x0, x1 = max(0, x0), min(width, x1)
+        if x0 >= x1:
+            return
+        self.frame.paste((0, 0, 0, 0), (x0, 0, x1, height))
+        top = self.origin[1]
+        for layer in (0, 1):  # 0 = 외곽선, 1 = 글자
+            for glyph, gx in self.placements:
+                image = glyph[layer]
+                a, b = max(gx, x0), min(gx + image.width, x1)
+                bottom = min(image.height, height - top)
+                if a >= b or bottom <= max(-top, 0):
+                    continue
+                self.frame.alpha_composite(image, dest=(a, max(top, 0)), source=(a - gx, max(-top, 0), b - gx, bottom))
+
+    def update(self, text, frame=None):
+        """
+        text를 frame에 반영하고 다시 올려야 하는 tiles 번호 목록을 반환합니다.
+        frame이 주어지면(같은 스타일로 미리 그려 둔 프레임) 다시 그리지 않고 그 프레임으로 바꿔 끼웁니다.
+        """
+        if not self.same_layout(text):
+            self.layout(text)
+            self.text = text
+            if frame is not None:
+                self.frame = frame
+            else:
+                self.redraw(0, self.frame.width)
+            return list(range(len(self.tiles)))
+
+        changed = [index for index, (a, b) in enumerate(zip(self.text, text)) if a != b]
+        self.text = text
+        if not changed:
+            return []
+
+        # 바뀐 글자의 글리프(외곽선 포함)가 차지하는 영역만 다시 그림
+        self.placements = [(self.atlas.glyph(ch), gx) for ch, (_, gx) in zip(text, self.placements)]
+        x0 = min(self.placements[i][1] for i in changed)
+        x1 = max(self.placements[i][1] + self.placements[i][0][0].width for i in changed)
+        if frame is not None:
+            self.frame = frame
+        else:
+            self.redraw(x0, x1)
+        return [index for index, (tx0, _, tx1, _) in enumerate(self.tiles) if tx0 < x1 and tx1 > x0]
 
-    # 한글 포함 글꼴 먼저 정렬
-    korean_fonts = sorted([font for font in fonts if any('\uAC00' <= char <= '\uD7A3' for char in font[0])], key=lambda x: x[0])
-    other_fonts = sorted([font for font in fonts if not any('\uAC00' <= char <= '\uD7A3' for char in font[0])], key=lambda x: x[0])
+class FramePipeline:
+    """
+    실행 중인 방향(스톱워치 +1, 카운트다운 -1)으로 다음 depth개의 프레임을 작업 스레드에서 미리 그려
+    작은 링 버퍼에 담아 둡니다. UI 틱은 준비된 프레임을 take()로 꺼내 바꿔 끼우기만 합니다.
+    정지, 시간 조정, 스타일 변경, 축구 모드 전환 때는 invalidate()로 버퍼를 비웁니다.
+    일정(Schedule)이 있으면 버퍼는 일정의 경과 시간으로 세고 표시 값은 일정에서 계산하므로, 구간이 바뀌는 프레임도 미리 그려집니다.
+    """
+    def __init__(self, depth=3):
+        self.depth = depth
+        self.condition = Condition()
+        self.generation = 0  # 무효화될 때마다 증가 (그리는 중이던 프레임을 버리기 위함)
+        self.style = None
+        self.direction = 0
+        self.cursor = 0  # 마지막으로 버퍼에 넣은 값 (일정이 있으면 경과 시간)
+        self.schedule = None
+        self.frames = deque()  # (값, 글자, 프레임)
+        Thread(target=self.run, daemon=True).start()
+
+    def invalidate(self):
+        with self.condition:
+            self.generation += 1
+            self.style = None
+            self.frames.clear()
+
+    def prime(self, style, direction, value, schedule=None):
+        """
+        지금 화면에 value가 떠 있으니 그 다음 프레임들을 준비하라고 알립니다.
+        """
+        with self.condition:
+            while self.frames and (self.frames[0][0] - value) * direction <= 0:
+                self.frames.popleft()  # 이미 지나간 프레임
+            if (style != self.style or direction != self.direction or schedule is not self.schedule
+                    or (not self.frames and self.cursor != value)):
+                self.generation += 1
+                self.frames.clear()
+                self.style, self.direction, self.cursor, self.schedule = style, direction, value, schedule
+            self.condition.notify()
+
+    def take(self, style, value):
+        """
+        미리 그려 둔 value의 (글자, 프레임)을 꺼냅니다. 준비되지 않았으면 None을 반환합니다.
+        """
+        with self.condition:
+            if style != self.style:
+                return None
+            while self.frames and (self.frames[0][0] - value) * self.direction < 0:
+                self.frames.popleft()
+            if self.frames and self.frames[0][0] == value:
+                self.condition.notify()
+                return self.frames.popleft()[1:]
+            return None
+
+    def has_work(self):
+        if self.style is None or len(self.frames) >= self.depth:
+            return False
+        if self.schedule is not None:
+            return self.cursor + self.direction < self.schedule.total  # 일정이 끝난 뒤는 그리지 않음
+        return self.cursor + self.direction >= 0  # 카운트다운은 0 아래로 그리지 않음
+
+    def run(self):
+        renderer = None
+        while True:
+            with self.condition:
+                while not self.has_work():
+                    self.condition.wait()
+                generation, style, schedule = self.generation, self.style, self.schedule
+                value = self.cursor + self.direction
+
+            # 무거운 그리기는 잠금 밖에서 (작업 스레드 전용 렌더러로 바뀐 칸만 다시 그림)
+            if renderer is None or renderer.style != style:
+                renderer = DigitCellRenderer(style)
+            text = format_time(value if schedule is None else schedule.value_at(value), style.football_mode, style.decimals)
+            renderer.update(text)
+            frame = renderer.frame.copy()
+
+            with self.condition:
+                if generation == self.generation:  # 그리는 동안 무효화되지 않았을 때만 넣음
+                    self.frames.append((value, text, frame))
+                    self.cursor = value
+
+def benchmark_renderer(font_path, frames=200, font_sizes=(48, 120, 200), thicknesses=(0, 2, 10, 30)):
+    """
+    TimerApp과 같은 그리기 경로(DigitCellRenderer.update로 바뀐 칸만 다시 그리고 그 칸만 잘라 올림)의
+    초당 프레임 수와 최대 메모리 사용량을 글꼴 크기, 외곽선 두께, 표시 모드별로 출력합니다. 화면(Tk) 없이 실행됩니다.
+    """
+    import tracemalloc
+
+    print(f"{'모드':<6} {'크기':>5} {'두께':>5} {'fps':>10} {'peak KiB':>10} {'칸/프레임':>9}")
+    for football_mode in (False, True):
+        for font_size in font_sizes:
+            for thickness in thicknesses:
+                # 앱처럼 그리기 영역을 글자 크기에 맞춤
+                size = measure_text(font_path, font_size, thickness, text_shape(format_time(0, football_mode)))
+                cells = DigitCellRenderer(TimerStyle(font_path, font_size, "black", "white", thickness, football_mode=football_mode, size=size))
+                cells.update(format_time(0, football_mode))  # 글리프 아틀라스와 셀 배치 준비
+
+                tracemalloc.start()
+                uploaded = 0
+                start = time.perf_counter()
+                for value in range(1, frames + 1):
+                    for index in cells.update(format_time(value, football_mode)):
+                        cells.frame.crop(cells.tiles[index]).tobytes()  # 앱이 Tk 이미지에 올리는 만큼
+                        uploaded += 1
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                mode = "축구" if football_mode else "일반"
+                print(f"{mode:<6} {font_size:>5} {thickness:>5} {frames / elapsed:>10.1f} {peak / 1024:>10.1f} {uploaded / frames:>9.2f}")
+
+def current_rss():
+    # 현재 프로세스의 상주 메모리(바이트). /proc이 없는 환경에서는 None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
 
-    return korean_fonts + other_fonts
+def soak_renderer(font_path, frames=20000, samples=10, font_size=120, thickness=2):
+    """
+    오래 켜 두었을 때 메모리가 늘지 않는지 확인합니다. 앱과 같은 경로(DigitCellRenderer.update, 바뀐 칸만 Tk 이미지에 paste)로
+    frames개의 프레임을 그리면서 samples번 Python 할당량(tracemalloc), 상주 메모리(RSS), Tk 이미지 개수를 기록하고,
+    첫 구간(준비) 이후로 할당량이 1MiB 넘게 늘거나 Tk 이미지 수가 바뀌면 실패로 봅니다. 화면이 없으면 Tk 이미지 확인은 건너뜁니다.
+    결과를 출력하고 통과했으면 True를 반환합니다.
+    """
+    import tracemalloc
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        from PIL import ImageTk
+    except tk.TclError:
+        root = None  # 화면 없음
+
+    text = format_time(0)
+    size = measure_text(font_path, font_size, thickness, text_shape(text))
+    cells = DigitCellRenderer(TimerStyle(font_path, font_size, "black", "white", thickness, size=size))
+    cells.update(text)
+    tiles = [ImageTk.PhotoImage(cells.frame.crop(box)) for box in cells.tiles] if root else None
+
+    tracemalloc.start()
+    rows = []
+    every = max(1, frames // samples)
+    start = time.perf_counter()
+    for value in range(1, frames + 1):
+        for index in cells.update(format_time(value)):
+            tile = cells.frame.crop(cells.tiles[index])
+            if tiles:
+                tiles[index].paste(tile)
+        if value % every == 0:
+            if root:
+                root.update_idletasks()
+            rows.append((value, tracemalloc.get_traced_memory()[0], current_rss(), len(root.image_names()) if root else None))
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    print(f"{'frames':>10} {'traced KiB':>12} {'RSS MiB':>10} {'Tk images':>10}")
+    for value, traced, rss, images in rows:
+        print(f"{value:>10} {traced / 1024:>12.1f} {rss / 2**20 if rss else float('nan'):>10.1f} {images if images is not None else '-':>10}")
+    growth = rows[-1][1] - rows[0][1]
+    passed = growth < 2**20 and (root is None or rows[-1][3] == rows[0][3])
+    print(f"{frames} frames in {elapsed:.1f}s, traced growth after warm-up {growth / 1024:.1f} KiB"
+          f"{'' if root else ' (no display: Tk image check skipped)'}: {'OK' if passed else 'FAIL'}")
+    if root:
+        root.destroy()
+    return passed
+
+def benchmark_outline_modes(font_path, font_size=48, text="00:00:00", thicknesses=range(1, 31), repeat=5):
+    """
+    외곽선 그리기 방식별로 text 한 줄을 (캐시 없이) 그리는 데 걸리는 시간을 비교해 출력합니다.
+    """
+    font = load_font(font_path, font_size)
+    left, top, right, bottom = font.getbbox(text)
+    print(f"{'두께':>4} " + " ".join(f"{mode:>10}" for mode in OUTLINE_MODES) + "  (ms/frame)")
+    for thickness in thicknesses:
+        size = (right - left + 2 * thickness + 2, bottom - top + 2 * thickness + 2)
+        origin = (thickness + 1 - left, thickness + 1 - top)
+        timings = []
+        for mode in OUTLINE_MODES:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                draw_outline_layer(size, origin, text, font, "white", thickness, mode)
+            timings.append((time.perf_counter() - start) / repeat * 1000)
+        print(f"{thickness:>4} " + " ".join(f"{ms:>10.2f}" for ms in timings))
+
+METRIC_BUCKETS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)  # 히스토그램 구간 상한(ms)
+
+class LatencyHistogram:
+    """
+    ms 단위 값을 고정된 구간(METRIC_BUCKETS_MS)별 개수로만 셉니다. 값을 쌓아 두지 않으므로 오래 켜 두어도 메모리가 늘지 않습니다.
+    """
+    def __init__(self):
+        self.counts = array('L', [0] * (len(METRIC_BUCKETS_MS) + 1))  # 마지막 칸은 1000ms 초과
+        self.count = 0
+        self.total = 0.0
+        self.peak = 0.0
+        self.last = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(METRIC_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        if ms > self.peak:
+            self.peak = ms
+
+    def percentile(self, q):
+        # 값이 속한 구간의 상한을 돌려줌 (최댓값을 넘지 않음)
+        target = q * self.count
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if count and running >= target:
+                return min(METRIC_BUCKETS_MS[index], self.peak) if index < len(METRIC_BUCKETS_MS) else self.peak
+        return 0.0
+
+    def snapshot(self):
+        return {
+            "n": self.count,
+            "last": round(self.last, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": round(self.peak, 3),
+            "buckets": list(self.counts),
+        }
+
+class TickMetrics:
+    """
+    틱 지연(jitter: 예약한 시각보다 늦게 깨어난 시간), 그리기 시간, Tk 이미지 업로드 시간,
+    표시 지연(drift: 초/프레임 경계보다 늦게 화면에 올라간 시간)을 히스토그램으로 모읍니다.
+    TimerApp.metrics가 None이면 측정 코드는 전혀 실행되지 않습니다.
+    """
+    def __init__(self, log_path=None, clock=time.perf_counter):
+        self.clock = clock
+        self.jitter = LatencyHistogram()
+        self.render = LatencyHistogram()
+        self.upload = LatencyHistogram()
+        self.drift = LatencyHistogram()
+        self.expected_tick = None  # 예약한 틱이 깨어나야 할 시각
+        self.frame_upload = 0.0  # 이번 그리기 중 업로드에 쓴 시간(초)
+        self.log = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    def tick_scheduled(self, delay_ms):
+        self.expected_tick = self.clock() + delay_ms / 1000
+
+    def tick_fired(self):
+        if self.expected_tick is not None:
+            self.jitter.add(max(0.0, (self.clock() - self.expected_tick) * 1000))
+            self.expected_tick = None
+
+    def record_render(self, started):
+        # 업로드 시간을 뺀 순수 그리기 시간
+        self.render.add((self.clock() - started - self.frame_upload) * 1000)
+        self.frame_upload = 0.0
+
+    def record_upload(self, started):
+        elapsed = self.clock() - started
+        self.frame_upload += elapsed
+        self.upload.add(elapsed * 1000)
+
+    def snapshot(self, dropped_frames=0):
+        return {
+            "time": time.time(),
+            "jitter": self.jitter.snapshot(),
+            "render": self.render.snapshot(),
+            "upload": self.upload.snapshot(),
+            "drift": self.drift.snapshot(),
+            "dropped_frames": dropped_frames,
+        }
+
+    def overlay_text(self, dropped_frames=0):
+        lines = [f"{'':7}{'last':>8}{'p50':>8}{'p99':>8}{'max':>8} ms"]
+        for name in ("jitter", "render", "upload", "drift"):
+            histogram = getattr(self, name)
+            lines.append(f"{name:7}{histogram.last:8.2f}{histogram.percentile(0.5):8.2f}{histogram.percentile(0.99):8.2f}{histogram.peak:8.2f}")
+        lines.append(f"dropped frames {dropped_frames}")
+        return "\n".join(lines)
+
+    def write_snapshot(self, dropped_frames=0):
+        # JSON Lines 한 줄 (1초에 한 번 정도만 호출되므로 매번 flush해도 부담 없음)
+        if self.log:
+            self.log.write(json.dumps(self.snapshot(dropped_frames)) + "\n")
+            self.log.flush()
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
+
+class TickClock:
+    """
+    time.monotonic() 기준점과 누적 정지 시간으로 경과 시간을 계산합니다.
+    표시 값은 매 틱마다 기준점에서 다시 계산되므로 틱이 늦게 호출되어도 오차가 쌓이지 않고,
+    오차는 한 번의 깨어남 지연(보통 수 ms)을 넘지 않습니다. 24시간이 지나도 누적 오차는 5ms 미만입니다.
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self.anchor = None  # 시작 기준점
+        self.paused_total = 0.0  # 누적 정지 시간
+        self.paused_at = None
+
+    def start(self):
+        now = self.clock()
+        if self.anchor is None:
+            self.anchor = now
+        elif self.paused_at is not None:
+            self.paused_total += now - self.paused_at
+        self.paused_at = None
+
+    def pause(self):
+        if self.anchor is not None and self.paused_at is None:
+            self.paused_at = self.clock()
+
+    def elapsed(self):
+        if self.anchor is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else self.clock()
+        return now - self.anchor - self.paused_total
+
+    def delay_until_next_tick(self, period=1.0):
+        """
+        다음 period 경계까지 남은 시간을 ms 단위로 반환합니다.
+        """
+        remaining = period - (self.elapsed() % period)
+        return max(1, math.ceil(remaining * 1000))  # 경계보다 먼저 깨어나지 않도록 올림
+
+class TimerCore:
+    """
+    Tk와 무관하게 타이머 하나의 상태(시/분/초, 방향, 실행 여부, 축구 모드)를 단조 시계 기준점으로 관리합니다.
+    여러 타이머 창의 타이머마다 하나씩 사용합니다.
+    """
+    def __init__(self, football_mode=False, clock=time.monotonic):
+        self.hours = 0
+        self.minutes = 0
+        self.seconds = 0
+        self.football_mode = football_mode
+        self.is_running = False
+        self.tick_clock = TickClock(clock)
+        self.tick_base = 0
+        self.tick_direction = 1
+
+    def get_total_seconds(self):
+        return self.hours * 3600 + self.minutes * 60 + self.seconds
+
+    def set_total_seconds(self, total):
+        if self.football_mode:
+            self.hours = 0
+            self.minutes, self.seconds = divmod(total, 60)
+        else:
+            self.hours, rest = divmod(total, 3600)
+            self.minutes, self.seconds = divmod(rest, 60)
+
+    def clock_value(self):
+        return self.tick_base + self.tick_direction * int(self.tick_clock.elapsed())
+
+    def rebase_clock(self):
+        self.tick_base = self.get_total_seconds() - self.tick_direction * int(self.tick_clock.elapsed())
+
+    def text(self):
+        return format_time(self.get_total_seconds(), self.football_mode)
+
+    def exact_value(self):
+        # 초 아래 자리까지 반영한 현재 값 (0 아래로는 내려가지 않음)
+        return max(0.0, self.tick_base + self.tick_direction * self.tick_clock.elapsed())
+
+    def start(self, direction):
+        self.is_running = True
+        self.tick_direction = direction
+        self.rebase_clock()
+        self.tick_clock.start()
+
+    def stop(self):
+        self.tick_clock.pause()
+        self.is_running = False
+
+    def reset(self):
+        self.stop()
+        self.hours = 0
+        self.minutes = 0
+        self.seconds = 0
+        self.tick_clock.reset()
+        self.tick_base = 0
+
+    def tick(self):
+        """
+        경과 시간으로 값을 맞춥니다. 카운트다운이 끝났으면 멈추고 False를 반환합니다.
+        """
+        value = self.clock_value()
+        if self.tick_direction < 0 and value < 0:
+            self.set_total_seconds(0)
+            self.stop()
+            return False
+        self.set_total_seconds(value)
+        return True
+
+    def adjust(self, amount, unit):
+        # TimerApp.adjust_time과 같은 규칙 (시간 -> 분 -> 초 자리 올림/내림)
+        if unit == 'hours':
+            if self.football_mode:
+                return
+            self.hours = max(0, self.hours + amount)
+        elif unit == 'minutes':
+            self.minutes += amount
+            if self.football_mode:
+                self.minutes = max(0, self.minutes)
+            elif self.minutes >= 60:
+                self.minutes -= 60
+                self.hours += 1
+            elif self.minutes < 0:
+                if self.hours > 0:
+                    self.minutes += 60
+                    self.hours -= 1
+                else:
+                    self.minutes = 0
+        elif unit == 'seconds':
+            self.seconds += amount
+            if self.seconds >= 60:
+                self.seconds -= 60
+                self.adjust(1, 'minutes')
+            elif self.seconds < 0:
+                if self.minutes > 0 or self.hours > 0:
+                    self.seconds += 60
+                    self.adjust(-1, 'minutes')
+                else:
+                    self.seconds = 0
+        self.rebase_clock()
+
+JOURNAL_HEADER = struct.Struct("<BBdd")  # 종류, 상태 비트, 벽시계 시각, 타이머 값
+JOURNAL_CRC = struct.Struct("<I")
+JOURNAL_RECORD_SIZE = JOURNAL_HEADER.size + JOURNAL_CRC.size  # 22바이트
+JOURNAL_SNAPSHOT, JOURNAL_START, JOURNAL_STOP, JOURNAL_RESET, JOURNAL_ADJUST, JOURNAL_FOOTBALL_MODE, JOURNAL_EXIT = range(7)
+JOURNAL_RUNNING, JOURNAL_COUNTDOWN, JOURNAL_FOOTBALL = 1, 2, 4  # 상태 비트
+
+class StateJournal:
+    """
+    타이머 상태가 바뀔 때(시작/정지/초기화/조정/축구 모드)만 22바이트짜리 기록을 파일 끝에 덧붙이는 저널입니다.
+    기록마다 그 순간의 값과 벽시계 시각이 들어 있으므로 틱마다 쓸 필요가 없고, 다시 켜면 마지막 기록을
+    현재 시각에 맞춰 이어 갑니다. 쓰기는 바로 OS에 넘겨 프로세스가 죽어도 남고, fsync는 sync_delay(ms)에 한 번만 합니다.
+    파일이 max_size를 넘으면 마지막 상태 하나로 압축합니다. 정상 종료할 때는 타이머를 멈춘 상태로 JOURNAL_EXIT 기록을 남기므로,
+    꺼져 있던 시간만큼 진행해서 되살리는 것은 비정상 종료했을 때뿐입니다.
+    """
+    def __init__(self, path=None, scheduler=None, sync_delay=1000, max_size=64 * 1024, wall_clock=time.time):
+        self.path = path or os.path.join(get_config_dir(), 'timer_journal.bin')
+        self.scheduler = scheduler  # after()/after_cancel()이 있는 객체 (없으면 압축할 때만 fsync)
+        self.sync_delay = sync_delay
+        self.max_size = max_size
+        self.wall_clock = wall_clock
+        self.fd = None
+        self.size = 0
+        self.valid_size = 0  # 파일에서 CRC가 맞는 마지막 기록이 끝나는 위치
+        self.sync_task = None
+        self.last = None  # 마지막으로 쓴 기록 (종류, 상태 비트, 벽시계 시각, 값)
+
+    @staticmethod
+    def pack(kind, flags, wall, value):
+        header = JOURNAL_HEADER.pack(kind, flags, wall, value)
+        return header + JOURNAL_CRC.pack(zlib.crc32(header))
+
+    def load(self):
+        """
+        파일 끝에서부터 CRC가 맞는 마지막 기록을 찾아 (종류, 상태 비트, 벽시계 시각, 값)으로 반환합니다. 없으면 None.
+        쓰는 도중 꺼져 잘리거나 깨진 꼬리는 건너뜁니다.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        self.valid_size = 0
+        for end in range(len(data) - len(data) % JOURNAL_RECORD_SIZE, 0, -JOURNAL_RECORD_SIZE):
+            start = end - JOURNAL_RECORD_SIZE
+            header = data[start:start + JOURNAL_HEADER.size]
+            if zlib.crc32(header) == JOURNAL_CRC.unpack_from(data, start + JOURNAL_HEADER.size)[0]:
+                self.valid_size = end
+                return JOURNAL_HEADER.unpack(header)
+        return None
+
+    def open(self, compact=True):
+        """
+        마지막 기록을 읽고 덧붙이기용으로 엽니다. compact가 True이면 그 기록 하나로 파일을 다시 쓰고(fsync 포함),
+        False이면 잘린 꼬리만 잘라 내고 바로 열어 압축은 나중에 compact()로 합니다 (첫 화면을 늦추지 않기 위함).
+        """
+        self.last = self.load()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if compact:
+            self.compact()
+        else:
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o644)
+            os.ftruncate(self.fd, self.valid_size if self.last else 0)
+            self.size = self.valid_size if self.last else 0
+        return self.last
+
+    def compact(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            if self.last:
+                f.write(self.pack(JOURNAL_SNAPSHOT, *self.last[1:]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)  # 바꿔 끼우는 순간에 꺼져도 이전 파일이나 새 파일 중 하나는 온전함
+        if self.fd is not None:
+            os.close(self.fd)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, 'O_BINARY', 0))
+        self.size = JOURNAL_RECORD_SIZE if self.last else 0
+
+    def append(self, kind, flags, value):
+        if self.fd is None:
+            return
+        self.last = (kind, flags, self.wall_clock(), value)
+        os.write(self.fd, self.pack(*self.last))
+        self.size += JOURNAL_RECORD_SIZE
+        if self.size >= self.max_size:
+            self.compact()
+        elif self.sync_task is None and self.scheduler is not None:
+            self.sync_task = self.scheduler.after(self.sync_delay, self.sync)
+
+    def sync(self):
+        # 모아 둔 기록을 한 번에 디스크에 내림 (전원이 꺼지는 경우 대비)
+        self.sync_task = None
+        if self.fd is not None:
+            os.fsync(self.fd)
+
+    def close(self):
+        if self.sync_task is not None:
+            self.scheduler.after_cancel(self.sync_task)
+        self.sync()
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+class LapRecorder:
+    """
+    스탑워치의 구간 기록(랩). 누를 때의 랩 시계 실행 시간(스탑워치로 실행한 시간만, 시간 조정과는 무관, 초)을 array('d') 하나에 이어 붙이므로
+    랩 하나에 8바이트만 쓰고(10만 개에 약 0.8MB) 기록은 틱을 막지 않습니다. 랩 시간은 앞 기록과의 차이로 계산합니다.
+    """
+    def __init__(self):
+        self.splits = array('d')
+
+    def __len__(self):
+        return len(self.splits)
+
+    def record(self, value):
+        self.splits.append(value)
+        return len(self.splits) - 1
+
+    def clear(self):
+        self.splits = array('d')
+
+    def lap(self, index):
+        # (랩 번호, 랩 시간, 누적 시간)
+        split = self.splits[index]
+        return index + 1, split - (self.splits[index - 1] if index else 0.0), split
+
+    def rows(self, start=0, stop=None):
+        # 시작할 때의 버퍼와 개수로만 읽으므로 내보내는 도중에 랩이 추가되거나 초기화되어도 안전함
+        splits = self.splits
+        previous = splits[start - 1] if start else 0.0
+        for index in range(start, len(splits) if stop is None else min(stop, len(splits))):
+            split = splits[index]
+            yield index + 1, split - previous, split
+            previous = split
+
+    def export(self, path, football_mode=False, decimals=2):
+        """
+        랩 기록을 한 줄씩 파일로 씁니다. 확장자가 .jsonl이면 JSON Lines, 그 외에는 CSV입니다.
+        초 값과 함께 화면 표시 형식(format_time)의 글자도 씁니다.
+        """
+        def format_value(value):
+            return format_time(value, football_mode, decimals)
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if path.lower().endswith(".jsonl"):
+                for number, lap_time, split in self.rows():
+                    f.write(json.dumps({"lap": number, "lap_time": round(lap_time, 6), "split": round(split, 6),
+                                        "lap_text": format_value(lap_time), "split_text": format_value(split)}, ensure_ascii=False) + "\n")
+            else:
+                import csv
+                writer = csv.writer(f)
+                writer.writerow(("lap", "lap_time", "split", "lap_text", "split_text"))
+                writer.writerows((number, f"{lap_time:.6f}", f"{split:.6f}", format_value(lap_time), format_value(split))
+                                 for number, lap_time, split in self.rows())
+
+def parse_duration(value):
+    """
+    일정 파일의 시간 값을 초로 바꿉니다. 숫자는 초, 문자열은 "SS", "MM:SS", "HH:MM:SS" 형식입니다.
+    """
+    if isinstance(value, str):
+        seconds = 0
+        for part in value.split(":"):
+            seconds = seconds * 60 + int(part)
+    else:
+        seconds = int(value)
+    if seconds < 0:
+        raise ValueError(f"잘못된 시간 값: {value}")
+    return seconds
+
+class Schedule:
+    """
+    경기(전반, 추가시간, 하프타임, 후반, 연장전)나 인터벌 운동(운동/휴식 수백 세트)처럼 여러 구간이 이어지는 일정입니다.
+    구간마다 이름, 길이(초), 방향(1: 올라감, -1: 남은 시간), 올라가는 구간의 시작 표시 값(예: 후반은 45:00부터)을 두고,
+    구간이 끝나는 누적 경과 시간(ends)을 미리 계산해 두어 전체 경과 시간 하나로 현재 구간과 남은 시간을 이분 탐색으로 찾습니다.
+    """
+    def __init__(self, segments, name="", football_mode=None):
+        self.name = name
+        self.football_mode = football_mode  # 일정 파일이 정한 표시 형식 (None이면 현재 설정 유지)
+        self.names = []
+        self.directions = array('b')
+        self.starts = array('l')
+        self.ends = array('l')  # 구간 i가 끝나는 누적 경과 시간(초)
+        total = 0
+        for segment_name, duration, direction, start in segments:
+            if duration <= 0:
+                raise ValueError(f"구간 길이는 0보다 커야 합니다: {segment_name}")
+            total += duration
+            self.names.append(segment_name)
+            self.directions.append(direction)
+            self.starts.append(start)
+            self.ends.append(total)
+        if not self.names:
+            raise ValueError("일정에 구간이 없습니다.")
+        self.total = total
+        # 일정 전체에서 가장 큰 표시 값 (화면 크기를 이 값에 맞춰 두면 구간이 바뀌어도 스타일이 바뀌지 않음)
+        self.peak = max(start + self.duration(index) if direction > 0 else self.duration(index)
+                        for index, (direction, start) in enumerate(zip(self.directions, self.starts)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def segment_start(self, index):
+        return self.ends[index - 1] if index else 0
+
+    def duration(self, index):
+        return self.ends[index] - self.segment_start(index)
+
+    def locate(self, elapsed):
+        # 경과 시간이 속한 구간 번호 (경계 시각은 다음 구간의 시작). 일정이 끝났으면 마지막 구간
+        return min(bisect_right(self.ends, elapsed), len(self.names) - 1)
+
+    def remaining(self, elapsed):
+        # (구간 번호, 그 구간의 남은 시간)
+        index = self.locate(elapsed)
+        return index, max(0, self.ends[index] - elapsed)
+
+    def value_at(self, elapsed):
+        """
+        전체 경과 시간에서 화면에 표시할 값을 계산합니다. 남은 시간 구간은 남은 시간을, 올라가는 구간은 시작 값 + 구간 경과 시간을 표시합니다.
+        """
+        index, remaining = self.remaining(elapsed)
+        if self.directions[index] < 0:
+            return remaining
+        return self.starts[index] + self.duration(index) - remaining
+
+    def label(self, index):
+        return f"{self.names[index]} ({index + 1}/{len(self.names)})"
+
+def expand_segments(items):
+    # 일정 파일의 구간 목록을 (이름, 길이, 방향, 시작 값)으로 펼침. {"repeat": n, "segments": [...]}는 n번 반복
+    for item in items:
+        if "repeat" in item:
+            count = int(item["repeat"])
+            inner = list(expand_segments(item["segments"]))
+            for number in range(1, count + 1):
+                for name, duration, direction, start in inner:
+                    yield f"{name} {number}/{count}", duration, direction, start
+            continue
+        count = item.get("count", "up")
+        if count not in ("up", "down"):
+            raise ValueError(f"count는 up 또는 down이어야 합니다: {count}")
+        yield (item.get("name", ""), parse_duration(item["duration"]), 1 if count == "up" else -1,
+               parse_duration(item.get("start", 0)))
+
+def load_schedule(path):
+    """
+    JSON 일정 파일을 읽어 Schedule을 만듭니다. 형식이 잘못되었으면 ValueError를 냅니다.
+    {"name": "축구 경기", "football_mode": true, "segments": [
+        {"name": "전반", "duration": "45:00"},
+        {"name": "하프타임", "duration": "15:00", "count": "down"},
+        {"name": "후반", "duration": "45:00", "start": "45:00"},
+        {"repeat": 8, "segments": [{"name": "운동", "duration": 40, "count": "down"}, {"name": "휴식", "duration": 20, "count": "down"}]}]}
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    try:
+        segments = list(expand_segments(data["segments"]))
+        football_mode = data.get("football_mode")
+        return Schedule(segments, data.get("name", os.path.basename(path)), None if football_mode is None else bool(football_mode))
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"잘못된 일정 파일: {e}") from e
+
+def do_nothing(*args):
+    pass
+
+class TimerMachine:
+    """
+    TimerApp의 타이머 동작(시작/정지/초기화, 틱 예약, 시간 조정과 길게 누르기, 축구 모드, 카운트다운 종료 깜빡임)을
+    화면과 분리한 상태 기계입니다. 상태는 TimerCore에 두고, 시계(clock)와 스케줄러(after/after_cancel을 가진 객체:
+    Tk 루트, HeapScheduler, SimulatedScheduler)를 주입받으므로 가상 시계로 몇 시간짜리 동작을 몇 초 만에 재현할 수 있습니다.
+    화면 쪽은 on_change(틱마다 그리기), on_adjust(값을 직접 바꿈), on_stop(정지), on_blink(덮기 여부), on_segment(일정의 구간 바뀜)로 알림을 받습니다.
+    일정(Schedule)이 있으면 TimerCore는 일정 전체의 경과 시간을 세는 스탑워치로 돌고, 표시 값과 구간은 그 경과 시간에서 계산합니다.
+    """
+    def __init__(self, scheduler, clock=time.monotonic, on_change=do_nothing, on_adjust=do_nothing, on_stop=do_nothing, on_blink=do_nothing,
+                 on_segment=do_nothing):
+        self.core = TimerCore(clock=clock)
+        self.scheduler = scheduler
+        self.clock = clock
+        self.on_change = on_change
+        self.on_adjust = on_adjust
+        self.on_stop = on_stop
+        self.on_blink = on_blink
+        self.on_segment = on_segment
+        self.schedule = None  # Schedule (일정 모드일 때만)
+        self.segment = None  # 지금 알린 구간 번호
+        self.decimals = 0  # 초 아래 표시 자릿수 (갱신 주기를 정함)
+        self.timer_task = None
+        self.last_frame_index = None  # 마지막으로 그린 프레임 번호 (프레임 예산 계산용)
+        self.dropped_frames = 0  # 그리기가 늦어 건너뛴 프레임 수
+        self.ticks = 0
+        self.hold_task = None
+        self.hold = None  # 길게 누르는 중인 (누른 시각, 양, 단위)
+        self.is_holding = False
+        self.metrics = None  # TickMetrics (켜져 있을 때만)
+        self.journal = None  # StateJournal (상태가 바뀔 때만 기록)
+        self.laps = LapRecorder()
+        self.lap_clock = TickClock(clock)  # 스탑워치로 실행 중인 시간만 세는 랩 전용 시계 (카운트다운 실행은 세지 않음)
+
+    def period(self):
+        return 1 / FRAME_RATES[self.decimals]
+
+    def set_decimals(self, decimals):
+        # 갱신 주기가 바뀌면 프레임 번호의 단위도 바뀌므로 건너뛴 프레임 계산을 새로 시작 (실행 중이면 다음 틱부터 적용)
+        if decimals != self.decimals:
+            self.decimals = decimals
+            self.last_frame_index = None
+
+    def display_value(self):
+        # 초 아래 자리를 표시할 때는 단조 시계의 경과 시간을 그대로 반영한 정확한 값을 사용
+        value = self.core.exact_value() if self.decimals else self.core.get_total_seconds()
+        if self.schedule is not None:
+            return self.schedule.value_at(value)
+        return value
+
+    def set_schedule(self, schedule):
+        # 일정을 걸거나(None이면 해제) 처음 구간부터 다시 시작할 수 있게 초기화
+        self.schedule = schedule
+        if schedule is not None and schedule.football_mode is not None:
+            self.core.football_mode = schedule.football_mode
+        self.reset()
+
+    def update_segment(self):
+        # 구간이 바뀌었으면 알림 (일정이 끝나면 구간이 넘어가도록 자동으로 진행됨)
+        index = None if self.schedule is None else self.schedule.locate(self.core.get_total_seconds())
+        if index != self.segment:
+            self.segment = index
+            self.on_segment(index)
+
+    def schedule_tick(self):
+        """
+        다음 틱을 예약합니다. 초 단위 표시는 다음 초 경계에, 초 아래 자리 표시는 다음 프레임 경계에 맞춥니다.
+        그리기가 프레임 예산(1/fps)을 넘어 늦어져도 밀린 프레임을 쌓지 않고 다음 경계로 건너뛰며,
+        건너뛴 프레임 수는 dropped_frames에 기록됩니다. 표시 값은 항상 경과 시간에서 계산되므로 정확합니다.
+        """
+        period = self.period()
+        tick_clock = self.core.tick_clock
+        frame_index = int(tick_clock.elapsed() / period)
+        if self.last_frame_index is not None and frame_index > self.last_frame_index + 1:
+            self.dropped_frames += frame_index - self.last_frame_index - 1
+        self.last_frame_index = frame_index
+        delay = tick_clock.delay_until_next_tick(period)
+        if self.metrics is not None:
+            # 방금 그린 프레임이 자기 경계보다 얼마나 늦게 올라갔는지와 다음 틱 예정 시각
+            self.metrics.drift.add((tick_clock.elapsed() - frame_index * period) * 1000)
+            self.metrics.tick_scheduled(delay)
+        self.timer_task = self.scheduler.after(delay, self.tick)
+
+    def tick(self):
+        # 경과 시간에서 값을 다시 계산하므로 늦게 호출된 틱도 바로 올바른 값으로 맞춰짐
+        if self.metrics is not None:
+            self.metrics.tick_fired()
+        self.timer_task = None
+        if not self.core.is_running:
+            return
+        self.ticks += 1
+        core = self.core
+        if core.tick_direction < 0:
+            value = core.clock_value()
+            if value < 0 or (self.decimals and core.exact_value() <= 0):
+                self.finish()
+                return
+        elif self.schedule is not None and core.clock_value() >= self.schedule.total:
+            self.finish()  # 마지막 구간까지 끝남
+            return
+        core.set_total_seconds(core.clock_value())
+        self.update_segment()
+        self.on_change()
+        self.schedule_tick()  # 다음 초(프레임) 경계에서 다음 시간 갱신
+
+    def journal_state(self, kind):
+        if self.journal is not None:
+            core = self.core
+            flags = ((JOURNAL_RUNNING if core.is_running else 0) | (JOURNAL_COUNTDOWN if core.tick_direction < 0 else 0)
+                     | (JOURNAL_FOOTBALL if core.football_mode else 0))
+            self.journal.append(kind, flags, core.exact_value())
+
+    def restore(self, record, now):
+        """
+        저널의 마지막 기록을 now(벽시계 시각) 기준으로 되살립니다.
+        실행 중이던 타이머는 꺼져 있던 시간만큼 진행된 값(초 아래 위상까지)에서 이어 가고, 그 사이 끝난 카운트다운은 0에서 멈춥니다.
+        """
+        _, flags, wall, value = record
+        core = self.core
+        direction = -1 if flags & JOURNAL_COUNTDOWN else 1
+        running = bool(flags & JOURNAL_RUNNING)
+        if running:
+            value += direction * max(0.0, now - wall)
+        value = max(0.0, value)
+        if running and direction < 0 and value <= 0:
+            running = False
+
+        # 값 = tick_base + direction * 경과 시간 이 되도록 기준점과 단조 시계를 맞춤
+        core.football_mode = bool(flags & JOURNAL_FOOTBALL)
+        core.tick_direction = direction
+        core.tick_base = math.floor(value) if direction > 0 else math.ceil(value)
+        tick_clock = core.tick_clock
+        tick_clock.reset()
+        tick_clock.anchor = tick_clock.clock() - direction * (value - core.tick_base)
+        tick_clock.paused_at = None if running else tick_clock.clock()
+        core.set_total_seconds(core.clock_value())
+        core.is_running = running
+        self.update_segment()
+        if running:
+            self.last_frame_index = None
+            self.schedule_tick()
+
+    def shutdown(self):
+        # 정상 종료: 실행 중이던 타이머도 지금 값에서 멈춘 것으로 기록해, 다음 실행에서 꺼져 있던 시간을 더하지 않음
+        if self.timer_task is not None:
+            self.scheduler.after_cancel(self.timer_task)
+            self.timer_task = None
+        self.core.stop()
+        self.lap_clock.pause()
+        self.journal_state(JOURNAL_EXIT)
+
+    def finish(self):
+        self.core.set_total_seconds(self.schedule.total if self.schedule is not None else 0)
+        self.update_segment()
+        self.stop()  # 타이머를 완전히 멈추도록 설정
+        self.blink()  # 깜빡임 시작
+
+    # 타이머 동작 버튼을 새로 누르는 순간에 타이머에 떠있던 시간을 기준으로 시작
+    def toggle(self, direction):
+        if self.core.is_running:
+            self.stop()  # 기존 타이머 작업이 있으면 중지
+        else:
+            self.start(direction)
+
+    def run(self, direction):
+        # 멱등 시작(원격 제어용): 이미 그 방향으로 실행 중이면 그대로 두고, 다른 방향이면 바꿔서 시작
+        if self.schedule is not None:
+            direction = 1
+        if self.core.is_running:
+            if self.core.tick_direction == direction:
+                return
+            self.stop()
+        self.start(direction)
+
+    def start(self, direction):
+        if self.schedule is not None:
+            direction = 1  # 일정은 항상 경과 시간으로 진행 (남은 시간 구간도 경과 시간에서 계산)
+        self.core.start(direction)
+        if direction > 0:
+            self.lap_clock.start()
+        self.journal_state(JOURNAL_START)
+        self.on_change()  # 현재 시간 이미지를 표시
+        self.last_frame_index = None
+        self.schedule_tick()  # 다음 초(프레임) 경계에서 타이머 갱신
+
+    def stop(self):
+        if self.timer_task is not None:  # 기존 타이머 작업이 있으면 중지
+            self.scheduler.after_cancel(self.timer_task)
+            self.timer_task = None
+        was_running = self.core.is_running
+        self.core.stop()
+        self.lap_clock.pause()
+        if was_running:
+            self.journal_state(JOURNAL_STOP)
+        self.on_stop()
+
+    def reset(self):
+        self.stop()
+        self.core.reset()
+        self.laps.clear()
+        self.lap_clock.reset()  # 랩을 지우면 랩 시계도 0부터
+        self.update_segment()
+        self.journal_state(JOURNAL_RESET)
+
+    def lap(self):
+        # 스탑워치가 실행 중일 때만 랩 시계의 실행 시간을 구간 기록으로 남기고 랩 번호(0부터)를 반환
+        # (표시 값은 시간 조정으로 뒤로 갈 수 있고 tick_clock은 카운트다운 실행과 함께 쓰므로 쓰지 않음: 랩 시간이 음수가 되지 않음)
+        if not self.core.is_running or self.core.tick_direction < 0:
+            return None
+        return self.laps.record(self.lap_clock.elapsed())
+
+    def adjust(self, amount, unit):
+        if self.schedule is not None and self.schedule.directions[self.schedule.locate(self.core.get_total_seconds())] < 0:
+            amount = -amount  # 남은 시간 구간에서는 표시 값이 누른 방향으로 움직이도록 경과 시간을 반대로 조정
+        self.core.adjust(amount, unit)  # 실행 중이어도 조정된 값부터 이어서 진행
+        self.update_segment()
+        self.journal_state(JOURNAL_ADJUST)
+        self.on_adjust()
+
+    def set_football_mode(self, enabled):
+        self.core.football_mode = enabled
+        if enabled:
+            self.core.hours = 0  # 축구 모드에서는 시간 부분을 없애기 위해 시간값을 0으로 설정
+        self.reset()  # 초기화 기록에 축구 모드 여부도 함께 남음
+
+    def press(self, amount, unit):
+        # 0.5초 넘게 누르고 있으면 0.1초마다 반복 (2초 이상 2배, 4초 이상 5배)
+        self.hold = (self.clock(), amount, unit)
+        self.is_holding = False
+        self.hold_task = self.scheduler.after(500, self.trigger_hold)
+
+    def trigger_hold(self):
+        self.is_holding = True
+        self.repeat_hold()
+
+    def repeat_hold(self):
+        if not self.is_holding:
+            return
+        pressed_at, amount, unit = self.hold
+        elapsed_time = self.clock() - pressed_at
+        if elapsed_time >= 4:
+            amount *= 5  # 4초 이상일 때 5씩 증감
+        elif elapsed_time >= 2:
+            amount *= 2  # 2초 이상일 때 2씩 증감
+        self.adjust(amount, unit)
+        self.hold_task = self.scheduler.after(100, self.repeat_hold)
+
+    def release(self):
+        if self.hold is None:
+            return
+        # 0.5초 이상 눌렀다면 추가 증감을 하지 않음
+        pressed_at, amount, unit = self.hold
+        if not self.is_holding and self.clock() - pressed_at < 0.5:
+            self.adjust(amount, unit)
+        self.is_holding = False
+        self.hold = None
+        if self.hold_task is not None:
+            self.scheduler.after_cancel(self.hold_task)
+            self.hold_task = None
+
+    # 카운트다운이 0초가 되었을 때 깜빡이게 설정
+    def blink(self, blink_count=5):
+        if blink_count > 0:
+            self.on_blink(True)  # 타이머를 가림
+            self.scheduler.after(500, self.on_blink, False)  # 0.5초 후 타이머 다시 표시
+            self.scheduler.after(1000, self.blink, blink_count - 1)  # 1초 후에 다음 깜빡임을 처리
+        else:
+            self.on_blink(False)  # 깜빡임이 끝나면 타이머를 다시 정상 상태로 표시
+
+class SimulatedClock:
+    """
+    가상 시계. 호출하면 현재 가상 시각(초)을 돌려주고, 시간은 SimulatedScheduler가 옮길 때만 흐릅니다.
+    """
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+class SimulatedScheduler:
+    """
+    Tk의 after() / after_cancel()을 가상 시계 위에서 흉내 내는 스케줄러입니다.
+    run_until()은 예약된 콜백을 시각 순서대로 실행하면서 시계를 그 시각으로 옮기고, latency()로 깨어남 지연(초)을 흉내 냅니다.
+    """
+    def __init__(self, clock, latency=None):
+        self.clock = clock
+        self.latency = latency
+        self.heap = []  # (마감 시각, 번호, 콜백, 인자)
+        self.counter = itertools.count()
+        self.cancelled = set()
+
+    def after(self, ms, callback, *args):
+        task_id = next(self.counter)
+        due = self.clock.now + ms / 1000 + (self.latency() if self.latency else 0)
+        heapq.heappush(self.heap, (due, task_id, callback, args))
+        return task_id
+
+    def after_cancel(self, task_id):
+        self.cancelled.add(task_id)
+
+    def run_until(self, deadline):
+        while self.heap and self.heap[0][0] <= deadline:
+            due, task_id, callback, args = heapq.heappop(self.heap)
+            if task_id in self.cancelled:
+                self.cancelled.discard(task_id)
+                continue
+            self.clock.now = max(self.clock.now, due)
+            callback(*args)
+        self.clock.now = max(self.clock.now, deadline)
+
+    def run_for(self, seconds):
+        self.run_until(self.clock.now + seconds)
+
+def simulate_timer(hours=24, decimals=0, seed=1):
+    """
+    가상 시계로 타이머 상태 기계를 돌려 hours시간 분량의 틱, 정지, 길게 누르기를 재현하고 결과를 딕셔너리로 반환합니다.
+    1) 스탑워치: 매시간 5분 정지, 30분마다 '초 +1'을 3초간 길게 누름
+    2) 축구 모드 스탑워치: 99분을 넘겨 120분까지
+    3) 2시간 카운트다운을 끝까지 (종료 깜빡임 포함)
+    깨어남 지연은 0~15ms 사이에서 무작위로 넣습니다. 화면은 그리지 않으므로 상태 기계의 틱 처리량도 함께 잽니다.
+    """
+    import random
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    scheduler = SimulatedScheduler(clock, latency=lambda: rng.uniform(0, 0.015))
+    blinks = []
+    machine = TimerMachine(scheduler, clock, on_blink=blinks.append)
+    machine.set_decimals(decimals)
+    machine.metrics = TickMetrics(clock=clock)  # 틱 지연과 경계 대비 지연을 가상 시각으로 잼
+    wall_start = time.perf_counter()
+
+    # 1) 스탑워치 + 정지 + 길게 누르기
+    run_time = 0.0
+    machine.toggle(1)
+    for hour in range(int(hours)):
+        for half in range(2):
+            machine.press(1, 'seconds')
+            scheduler.run_for(3)
+            machine.release()
+            scheduler.run_for(1797)
+        run_time += 3600
+        machine.toggle(1)  # 정지
+        scheduler.run_for(300)
+        machine.toggle(1)  # 다시 시작
+    machine.toggle(1)
+    # 표시 값과 경과 시간으로 계산한 정확한 값의 차이 (마지막 틱 이후의 초 미만만 남아야 함)
+    stopwatch_error = machine.core.exact_value() - machine.core.get_total_seconds()
+    held = machine.core.get_total_seconds() - int(run_time)
+    stopwatch_text = machine.core.text()
+    stopwatch_ticks = machine.ticks
+
+    # 2) 축구 모드에서 99분 넘기기
+    machine.set_football_mode(True)
+    machine.toggle(1)
+    scheduler.run_for(120 * 60)
+    machine.toggle(1)
+    football_text = machine.core.text()
+
+    # 3) 2시간 카운트다운
+    machine.set_football_mode(False)
+    machine.adjust(2, 'hours')
+    machine.toggle(-1)
+    scheduler.run_for(2 * 3600 + 10)
+    countdown_finished = not machine.core.is_running and machine.core.get_total_seconds() == 0
+
+    wall = time.perf_counter() - wall_start
+    return {
+        "ticks": machine.ticks,
+        "stopwatch_ticks": stopwatch_ticks,
+        "dropped_frames": machine.dropped_frames,
+        "jitter_ms_max": round(machine.metrics.jitter.peak, 3),
+        "drift_ms_p99": machine.metrics.drift.percentile(0.99),
+        "drift_ms_max": round(machine.metrics.drift.peak, 3),
+        "stopwatch_text": stopwatch_text,
+        "stopwatch_error": round(stopwatch_error, 3),
+        "held_seconds": held,  # 길게 누르기로 더해진 초 (정지 시간은 빠져야 함)
+        "football_text": football_text,
+        "countdown_finished": countdown_finished,
+        "blinks": blinks.count(True),
+        "simulated_hours": clock.now / 3600,
+        "wall_seconds": wall,
+        "ticks_per_second": machine.ticks / wall if wall else 0.0,
+    }
+
+class HeapScheduler:
+    """
+    여러 타이머의 다음 갱신 시각을 우선순위 큐(heapq)에 넣어 두고, 가장 빠른 시각에 한 번만 깨어나는 스케줄러입니다.
+    Tk의 after() / after_cancel()과 같은 모양으로 사용합니다. 타이머가 몇 개든 Tk 타이머는 하나만 걸려 있습니다.
+    """
+    def __init__(self, root, clock=time.monotonic):
+        self.root = root
+        self.clock = clock
+        self.heap = []  # (마감 시각, 번호, 콜백, 인자)
+        self.counter = itertools.count()
+        self.cancelled = set()
+        self.wake_task = None
+        self.wake_deadline = None
+
+    def after(self, ms, callback, *args):
+        task_id = next(self.counter)
+        heapq.heappush(self.heap, (self.clock() + ms / 1000, task_id, callback, args))
+        self.rearm()
+        return task_id
+
+    def after_cancel(self, task_id):
+        self.cancelled.add(task_id)  # 힙에서 꺼낼 때 버림
+
+    def rearm(self):
+        while self.heap and self.heap[0][1] in self.cancelled:
+            self.cancelled.discard(heapq.heappop(self.heap)[1])
+        if not self.heap:
+            return
+        deadline = self.heap[0][0]
+        if self.wake_deadline is not None and self.wake_deadline <= deadline:
+            return  # 이미 더 이른 시각에 깨어나도록 걸려 있음
+        if self.wake_task:
+            self.root.after_cancel(self.wake_task)
+        delay = max(0, math.ceil((deadline - self.clock()) * 1000))
+        self.wake_task = self.root.after(delay, self.run_due)
+        self.wake_deadline = deadline
+
+    def run_due(self):
+        self.wake_task = None
+        self.wake_deadline = None
+        now = self.clock() + 0.001  # Tk 타이머 해상도(1ms) 안에 있는 작업은 같이 처리
+        while self.heap and self.heap[0][0] <= now:
+            _, task_id, callback, args = heapq.heappop(self.heap)
+            if task_id in self.cancelled:
+                self.cancelled.discard(task_id)
+                continue
+            callback(*args)
+        self.rearm()
+
+    def close(self):
+        # 예약된 작업과 Tk 타이머를 모두 버림 (root 창을 닫기 전에 호출)
+        if self.wake_task:
+            self.root.after_cancel(self.wake_task)
+        self.wake_task = None
+        self.wake_deadline = None
+        self.heap.clear()
+        self.cancelled.clear()
+
+class ControlServer:
+    """
+    Tk 루프와 별도의 스레드에서 asyncio 제어 서버를 돌립니다. 주소는 "unix:/경로" 또는 "호스트:포트" 형식입니다.
+    명령은 한 줄에 하나씩 받습니다:
+        start_stopwatch, start_countdown, stop, pause, resume, reset, lap, adjust <양> <hours|minutes|seconds>, subscribe
+    버튼과 달리 명령은 여러 번 보내도 결과가 같습니다: start_*는 이미 그 방향으로 실행 중이면 그대로 두고, stop(pause)은 멈춘 상태를 유지하며,
+    resume은 마지막 방향으로 다시 시작합니다.
+    명령은 command_queue를 통해 Tk 스레드에서 실행되고, subscribe한 클라이언트에는 매 틱의 시간 값을 JSON 한 줄로 보냅니다.
+    """
+    commands = ("start_stopwatch", "start_countdown", "stop", "pause", "resume", "reset", "adjust", "lap", "subscribe")
+
+    def __init__(self, address, command_queue, max_buffer=64 * 1024):
+        self.address = address
+        self.command_queue = command_queue
+        self.max_buffer = max_buffer  # 이보다 많이 밀린 구독자는 느린 클라이언트로 보고 끊음
+        self.subscribers = set()
+        self.clients = {}  # 연결마다 하나씩 도는 handle_client 작업 -> writer (종료할 때 연결을 끊고 끝나기를 기다림)
+        import asyncio  # --control을 쓸 때만 가져옴
+        self.loop = asyncio.new_event_loop()
+        self.ready = Event()
+        self.error = None
+
+    def start(self):
+        Thread(target=self.run, daemon=True).start()
+        self.ready.wait()
+        if self.error:
+            raise self.error
+
+    def run(self):
+        import asyncio
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve())
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def serve(self):
+        import asyncio
+        if self.address.startswith("unix:"):
+            path = self.address[len("unix:"):]
+            try:
+                if S_ISSOCK(os.stat(path).st_mode):
+                    os.unlink(path)  # 이전 실행에서 남은 소켓 파일 (소켓이 아닌 파일은 지우지 않고 bind 오류로 알림)
+            except FileNotFoundError:
+                pass
+            self.server = await asyncio.start_unix_server(self.handle_client, path=path, backlog=1024)
+        else:
+            host, _, port = self.address.rpartition(":")
+            self.server = await asyncio.start_server(self.handle_client, host or "127.0.0.1", int(port), backlog=1024)
+
+    async def handle_client(self, reader, writer):
+        import asyncio
+        task = asyncio.current_task()
+        self.clients[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode("utf-8", "replace").split()
+                if not parts or parts[0] not in self.commands:
+                    writer.write(b'{"error":"unknown command"}\n')
+                    continue
+                if parts[0] == "subscribe":
+                    self.subscribers.add(writer)
+                else:
+                    self.command_queue.put((parts[0], parts[1:]))
+                writer.write(b'{"ok":true}\n')
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.pop(task, None)
+            self.subscribers.discard(writer)
+            writer.close()
+
+    def publish(self, value, text):
+        """
+        Tk 스레드에서 호출합니다. 틱마다 한 번만 직렬화해서 모든 구독자에게 같은 바이트를 보냅니다.
+        """
+        if not self.subscribers:
+            return
+        payload = (json.dumps({"value": value, "text": text}, ensure_ascii=False) + "\n").encode("utf-8")
+        self.loop.call_soon_threadsafe(self.broadcast, payload)
+
+    def broadcast(self, payload):
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                # 받는 속도가 느려 버퍼가 쌓인 클라이언트는 끊어서 다른 구독자를 지연시키지 않음
+                self.subscribers.discard(writer)
+                writer.transport.abort()
+                continue
+            writer.write(payload)
+
+    async def shutdown(self):
+        import asyncio
+        self.server.close()
+        # 작업을 취소하지 않고 연결을 끊어 handle_client가 스스로 끝나게 함 (작업이 남은 채 루프를 멈추면 종료 경고가 남)
+        clients = list(self.clients.items())
+        for task, writer in clients:
+            writer.transport.abort()
+        await asyncio.gather(*(task for task, _ in clients), return_exceptions=True)
+
+    def close(self, timeout=2):
+        import asyncio
+        try:
+            asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop).result(timeout)
+        except Exception as e:
+            print(f"Error closing control server: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+def load_test_control(subscribers=1000, ticks=30, interval=0.1):
+    """
+    제어 서버에 구독자 subscribers개를 붙이고 ticks번 방송해 모든 구독자가 모든 틱을 받는지와 전달 지연을 잽니다.
+    방송 값에는 보낸 시각(perf_counter)을 넣어 받는 쪽에서 지연을 계산합니다. 결과를 출력하고 통과했으면 True를 반환합니다.
+    """
+    import asyncio
+    import tempfile
+    try:
+        import resource  # 구독자마다 양쪽 소켓 두 개가 필요하므로 열 수 있는 파일 수를 늘림
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = subscribers * 2 + 256
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted if hard == resource.RLIM_INFINITY else min(wanted, hard), hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+    folder = tempfile.mkdtemp()
+    use_unix = hasattr(asyncio, "open_unix_connection") and os.name != "nt"
+    address = f"unix:{os.path.join(folder, 'control.sock')}" if use_unix else "127.0.0.1:0"
+    server = ControlServer(address, queue.Queue())
+    server.start()
+    if not use_unix:
+        port = server.server.sockets[0].getsockname()[1]
+
+    latencies = []
+    received = [0]
+
+    async def subscriber(subscribed):
+        if use_unix:
+            reader, writer = await asyncio.open_unix_connection(address[len("unix:"):])
+        else:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"subscribe\n")
+        await writer.drain()
+        await reader.readline()  # {"ok":true}
+        subscribed()
+        for _ in range(ticks):
+            line = await reader.readline()
+            if not line:
+                break
+            latencies.append((time.perf_counter() - json.loads(line)["value"]) * 1000)
+            received[0] += 1
+        writer.close()
+
+    def publish_ticks():
+        for tick in range(ticks):
+            server.publish(time.perf_counter(), str(tick))
+            time.sleep(interval)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        all_subscribed = asyncio.Event()
+        count = [0]
+
+        def subscribed():
+            count[0] += 1
+            if count[0] == subscribers:
+                all_subscribed.set()
+
+        tasks = [asyncio.ensure_future(subscriber(subscribed)) for _ in range(subscribers)]
+        started = time.perf_counter()
+        await asyncio.wait_for(all_subscribed.wait(), 30)
+        connect_time = time.perf_counter() - started
+        await loop.run_in_executor(None, publish_ticks)
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 30)
+        errors = [result for result in results if isinstance(result, Exception)]
+        return connect_time, errors
+
+    try:
+        connect_time, errors = asyncio.run(run())
+    except asyncio.TimeoutError:
+        connect_time, errors = float("nan"), ["timeout"]
+    finally:
+        server.close()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    latencies.sort()
+    expected = subscribers * ticks
+    passed = received[0] == expected and not errors
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else float("nan")
+
+    print(f"     subscribers: {subscribers} (connected and subscribed in {connect_time:.2f}s)")
+    print(f"        messages: {received[0]}/{expected}" + (f", {len(errors)} client errors: {errors[0]!r}" if errors else ""))
+    print(f"  latency p50/p99/max: {percentile(0.5):.2f} / {percentile(0.99):.2f} / {percentile(1.0):.2f} ms")
+    print("OK" if passed else "FAIL")
+    return passed
+
+def open_frame_output(target):
+    """
+    "-"(표준 출력), "fd:번호" 또는 파일/named pipe 경로를 쓰기용 파일 디스크립터로 엽니다.
+    """
+    if target == "-":
+        return sys.stdout.fileno()
+    if target.startswith("fd:"):
+        return int(target[3:])
+    # 일반 파일은 비우고 씀 (남은 바이트가 있으면 원시 스트림이 깨짐). named pipe에는 O_TRUNC가 영향을 주지 않음
+    return os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+
+class FrameStreamer:
+    """
+    타이머 프레임을 배경이 투명한 RGBA 원시 바이트(가로 x 세로 x 4)로, 고정 해상도와 프레임 수로 계속 씁니다.
+    ffmpeg -f rawvideo -pix_fmt rgba -s WxH -framerate FPS -i <파이프> 나 OBS의 입력으로 사용할 수 있습니다.
+    화면(Tk)은 필요 없습니다.
+    """
+    def __init__(self, fd, style, fps=30, clock=time.monotonic):
+        self.fd = fd
+        self.style = style
+        self.fps = fps
+        self.clock = clock
+        self.cells = DigitCellRenderer(style)
+        self.frames_written = 0
+        self.frames_late = 0  # 제 시각보다 한 프레임 넘게 늦어 쉬지 않고 따라잡으며 쓴 프레임 수
+
+    def write_frame(self, payload):
+        # 같은 바이트 버퍼를 memoryview로 잘라 쓰므로 부분 쓰기에도 추가 복사가 없음
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(self.fd, view):]
+        self.frames_written += 1
+
+    def run(self, core, duration=None):
+        """
+        core(TimerCore)의 값을 duration초 동안(없으면 파이프가 닫힐 때까지) 스트리밍합니다.
+        값이 바뀐 프레임만 다시 그리고 직렬화하며, 값이 같은 프레임은 이전 바이트를 그대로 다시 씁니다.
+        프레임 n은 시작 시각 + n/fps에 맞춰 쓰고, 늦어지면 쉬지 않고 그 시각의 값으로 프레임을 이어 써서 따라잡으므로
+        프레임 수와 영상의 시간축이 어긋나지 않습니다. 따라잡으며 쓴 프레임 수는 frames_late에 남습니다.
+        """
+        period = 1 / self.fps
+        start = self.clock()
+        total_frames = None if duration is None else int(duration * self.fps)
+        last_text = None
+        payload = None
+        try:
+            while total_frames is None or self.frames_written < total_frames:
+                if core.is_running:
+                    core.tick()
+                text = format_time(core.exact_value() if self.style.decimals else core.get_total_seconds(), self.style.football_mode, self.style.decimals)
+                if text != last_text:
+                    self.cells.update(text)  # 바뀐 칸만 다시 그림
+                    payload = self.cells.frame.tobytes()
+                    last_text = text
+                self.write_frame(payload)
+
+                delay = start + self.frames_written * period - self.clock()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -period:
+                    self.frames_late += 1
+        except BrokenPipeError:
+            pass  # 읽는 쪽이 종료됨
+
+def check_stream(font_path, seconds=3, fps=20, size=(320, 120), start=10):
+    """
+    FrameStreamer를 파이프로 읽는 쪽에 연결해 타이밍과 내용을 확인하고, 결과를 출력한 뒤 모두 통과했으면 True를 반환합니다.
+    1) 파이프: start초 카운트다운을 seconds초 동안 fps로 받아 프레임 수, 도착 시각(목표 대비 지연), 프레임마다 그 시각의 값으로 그린 기준 프레임과 같은지
+    2) 파일: 더 긴 쓰레기 바이트가 든 파일에 써도 파일 크기가 정확히 프레임 수 x 프레임 크기인지
+    ffmpeg가 설치되어 있으면 같은 스트림을 ffmpeg로 디코딩해 프레임 수도 확인합니다.
+    """
+    style = TimerStyle(font_path, fit_font_size(font_path, 2, text_shape("00:00:00"), int(size[0] * 0.9), int(size[1] * 0.9)),
+                       "black", "white", 2, size=size)
+    frame_size = size[0] * size[1] * 4
+    frames = seconds * fps
+    reference = DigitCellRenderer(style)
+    expected = {}  # 글자 -> 기준 프레임 바이트
+
+    def reference_frame(value):
+        text = format_time(max(0, value))
+        if text not in expected:
+            reference.update(text)
+            expected[text] = reference.frame.tobytes()
+        return expected[text]
+
+    def stream(fd, duration):
+        core = TimerCore()
+        core.set_total_seconds(start)
+        core.start(-1)
+        try:
+            FrameStreamer(fd, style, fps).run(core, duration)
+        finally:
+            os.close(fd)
+
+    # 1) 파이프로 읽기
+    read_fd, write_fd = os.pipe()
+    began = time.perf_counter()
+    Thread(target=stream, args=(write_fd, seconds), daemon=True).start()
+    late_ms = []
+    mismatched = 0
+    received = 0
+    with os.fdopen(read_fd, "rb") as reader:
+        while True:
+            payload = reader.read(frame_size)
+            if len(payload) < frame_size:
+                break
+            arrived = time.perf_counter() - began
+            late_ms.append((arrived - received / fps) * 1000)
+            # 경계 근처의 프레임은 바로 앞 값일 수도 있음
+            value = start - int(received / fps)
+            if payload not in (reference_frame(value), reference_frame(value + 1)):
+                mismatched += 1
+            received += 1
+    elapsed = time.perf_counter() - began
+    results = [
+        ("frames", received == frames, f"{received}/{frames}"),
+        ("duration", abs(elapsed - seconds) < 0.5, f"{elapsed:.2f}s (target {seconds}s)"),
+        ("max lateness", max(late_ms, default=0) < 1000 / fps * 2, f"{max(late_ms, default=0):.1f} ms"),
+        ("content", mismatched == 0, f"{mismatched} mismatched frames"),
+    ]
+
+    # 2) 기존 파일 덮어쓰기
+    import tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "timer.rgba")
+        with open(path, "wb") as f:
+            f.write(b"\xff" * frame_size * (fps + 3))
+        stream(open_frame_output(path), 0.5)
+        written = os.path.getsize(path)
+        results.append(("file truncate", written == frame_size * int(0.5 * fps), f"{written} bytes"))
+
+        # ffmpeg가 있으면 실제로 디코딩해 봄
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg:
+            import subprocess
+            probe = subprocess.run([ffmpeg, "-v", "error", "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{size[0]}x{size[1]}",
+                                    "-framerate", str(fps), "-i", path, "-f", "null", "-"], capture_output=True, text=True)
+            results.append(("ffmpeg decode", probe.returncode == 0 and not probe.stderr.strip(), probe.stderr.strip() or "ok"))
+
+    for name, passed, detail in results:
+        print(f"{name:>16}: {'OK' if passed else 'FAIL'} ({detail})")
+    return all(passed for _, passed, _ in results)
+
+sequence_cells = None  # 일괄 렌더링 작업 프로세스마다 하나씩 만드는 렌더러
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def encode_png(image, level=1):
+    """
+    RGBA 이미지를 줄 필터 없이(filter 0) zlib으로만 압축한 PNG 바이트로 만듭니다.
+    Pillow의 PNG 저장은 줄마다 필터를 골라 보느라 프레임 인코딩 시간의 대부분을 쓰는데,
+    투명한 바탕에 글자만 있는 타이머 프레임은 필터 없이도 거의 같은 크기로 압축됩니다.
+    """
+    width, height = image.size
+    data = image.tobytes()
+    stride = width * 4
+    raw = b"".join(b"\x00" + data[y * stride:(y + 1) * stride] for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + png_chunk(b"IDAT", zlib.compress(raw, level))
+            + png_chunk(b"IEND", b""))
+
+def init_sequence_worker(style):
+    # 작업 프로세스가 시작될 때 한 번만 폰트를 읽고 글리프 아틀라스를 만듦
+    global sequence_cells
+    sequence_cells = DigitCellRenderer(style)
+
+def render_sequence_frame(job):
+    """
+    (글자, 저장 경로) 작업 하나를 그립니다. 경로가 없으면 RGBA 바이트를 돌려줍니다.
+    """
+    text, path = job
+    sequence_cells.update(text)  # 연속된 프레임은 바뀐 칸만 다시 그림
+    if path is None:
+        return sequence_cells.frame.tobytes()
+    with open(path, "wb") as f:
+        f.write(encode_png(sequence_cells.frame))
+    return None
+
+APNG_MEMORY_LIMIT = 1 << 30  # APNG는 저장할 때 모든 프레임을 메모리에 두므로 이보다 커지면 거절함
+
+def render_sequence(output, style, values, image_format="png", frame_duration=1.0, workers=None):
+    """
+    values의 각 시간 값을 프레임으로 그려 output에 저장합니다.
+    png: output 폴더에 frame_000000.png 형식으로 저장, apng: output 파일 하나로 저장
+    같은 글자가 되는 프레임은 한 번만 그리고 나머지는 복사하며, 그리기는 multiprocessing 풀에 나눠 맡깁니다.
+    결과는 imap으로 순서대로 하나씩 받아 처리하므로 작업 결과가 한꺼번에 메모리에 쌓이지 않습니다.
+    APNG는 Pillow가 저장할 때 모든 프레임을 들고 있어야 하므로, 그 크기가 APNG_MEMORY_LIMIT를 넘으면 ValueError를 냅니다.
+    """
+    texts = [format_time(value, style.football_mode, style.decimals) for value in values]
+    first_index = {}
+    for index, text in enumerate(texts):
+        first_index.setdefault(text, index)
+
+    if image_format == "png":
+        os.makedirs(output, exist_ok=True)
+        paths = [os.path.join(output, f"frame_{index:06}.png") for index in range(len(texts))]
+        jobs = [(text, paths[index]) for text, index in first_index.items()]
+    else:
+        needed = len(first_index) * style.size[0] * style.size[1] * 4
+        if needed > APNG_MEMORY_LIMIT:
+            raise ValueError(f"APNG로 저장하려면 프레임 {len(first_index)}개를 모두 메모리에 두어야 합니다 ({needed / 2**30:.1f} GiB). "
+                             "--format png를 쓰거나 --step, --size로 프레임 수나 크기를 줄이세요.")
+        jobs = [(text, None) for text in first_index]
+
+    import multiprocessing  # 일괄 렌더링에서만 쓰므로 여기서 가져옴
+    rendered = {}
+    with multiprocessing.Pool(workers, initializer=init_sequence_worker, initargs=(style,)) as pool:
+        results = pool.imap(render_sequence_frame, jobs, chunksize=max(1, min(64, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+        for (text, _), data in zip(jobs, results):
+            if data is not None:
+                rendered[text] = Image.frombytes("RGBA", style.size, data)  # 받은 바이트는 바로 이미지로 바꾸고 버림
+
+    if image_format == "png":
+        for index, text in enumerate(texts):
+            if first_index[text] != index:
+                shutil.copyfile(paths[first_index[text]], paths[index])  # 같은 프레임은 다시 그리지 않고 복사
+        return len(first_index)
+
+    frames = [rendered[text] for text in texts]  # 같은 글자의 프레임은 같은 이미지 객체를 가리킴
+    frames[0].save(output, format="PNG", save_all=True, append_images=frames[1:], duration=int(frame_duration * 1000), loop=0)
+    return len(first_index)
+
+@lru_cache(maxsize=64)
+def render_font_preview(font_path, size=(300, 50)):
+    """
+    폰트 미리보기 이미지를 그립니다. 최근에 본 폰트는 캐시에서 바로 돌려줍니다.
+    """
+    pil_font = load_font(font_path, 20, fallback=False)
+    img = Image.new("RGBA", size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    draw.text((10, 10), "ABCD 1234 ㄱㄴㄷㄹ", font=pil_font, fill="black")
+    return img
 
 class FontDialog(tk.Toplevel):
-    def __init__(self, parent, font_list):
+    preview_executor = None  # 미리보기는 UI 스레드 밖에서 하나씩 그림 (처음 미리볼 때 만듦)
+    preview_delay = 120  # 선택이 이 시간(ms) 동안 그대로일 때만 미리보기를 그림
+
+    def __init__(self, parent, font_list, font_queue=None):
         super().__init__(parent)
         self.title("폰트 선택")
-        self.font_list = font_list
+        self.font_list = list(font_list)
+        self.font_keys = [font_sort_key((font, path, has_hangul(font))) for font, path in self.font_list]
+        self.font_queue = font_queue
         self.selected_font = None
+        self.preview_task = None
+        self.preview_token = 0
+        self.poll_task = None
+        self.drain_task = None
 
         self.font_listbox = tk.Listbox(self, selectmode=tk.SINGLE, width=50, height=20)
         self.font_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -119,25 +2293,90 @@ class FontDialog(tk.Toplevel):
         self.file_button = tk.Button(self, text="글꼴 파일로 불러오기", command=self.select_font_file, width=20)
         self.file_button.pack(side=tk.RIGHT, padx=5)
 
+        # 대화상자가 열려 있는 동안 다른 창을 막아 폰트 검색이 겹쳐 시작되지 않게 함
+        self.transient(parent)
+        self.wait_visibility()
+        self.grab_set()
+
+        # 폰트 목록이 아직 읽히는 중이면 큐에 들어오는 대로 목록에 추가
+        if self.font_queue is not None:
+            self.title("폰트 선택 (불러오는 중...)")
+            self.drain_task = self.after(50, self.drain_font_queue)
+
+    def destroy(self):
+        # 선택하거나 창을 닫은 뒤에 예약해 둔 목록 읽기와 미리보기가 사라진 위젯을 건드리지 않게 취소
+        for task in (self.drain_task, self.preview_task, self.poll_task):
+            if task is not None:
+                self.after_cancel(task)
+        self.drain_task = self.preview_task = self.poll_task = None
+        super().destroy()
+
+    def drain_font_queue(self):
+        self.drain_task = None
+        try:
+            while True:
+                batch = self.font_queue.get_nowait()
+                if batch is None:
+                    self.title("폰트 선택")
+                    return
+                self.add_fonts(batch)
+        except queue.Empty:
+            pass
+        self.drain_task = self.after(50, self.drain_font_queue)
+
+    def add_fonts(self, fonts):
+        # 한글 글꼴 먼저, 이름순 정렬을 유지하도록 정렬된 위치에 끼워 넣음
+        for font, path, hangul in fonts:
+            key = font_sort_key((font, path, hangul))
+            index = bisect_right(self.font_keys, key)
+            self.font_keys.insert(index, key)
+            self.font_list.insert(index, (font, path))
+            self.font_listbox.insert(index, font)
+
     def show_font_preview(self, event):
-        selection = event.widget.curselection()
-        if selection:
-            index = selection[0]
-            font_name, font_path = self.font_list[index]
-            try:
-                self.preview_canvas.delete("all")
-                if font_path.lower().endswith(('.ttf', '.otf')):
-                    pil_font = ImageFont.truetype(font_path, 20)
-                    img = Image.new("RGBA", (300, 50), (255, 255, 255, 0))
-                    draw = ImageDraw.Draw(img)
-                    draw.text((10, 10), "ABCD 1234 ㄱㄴㄷㄹ", font=pil_font, fill="black")
-                    self.preview_image = ImageTk.PhotoImage(img)
-                    self.preview_canvas.create_image(0, 0, anchor="nw", image=self.preview_image)
-                else:
-                    self.preview_canvas.create_text(150, 25, text="미리보기 불가\n(하지만 적용 가능합니다.)", fill="red")
-            except Exception as e:
-                self.preview_canvas.delete("all")
-                self.preview_canvas.create_text(150, 25, text="미리보기 불가\n(하지만 적용 가능합니다.)", fill="red")
+        # 방향키를 누르고 있는 동안에는 그리지 않고, 선택이 멈췄을 때 한 번만 그림
+        if self.preview_task:
+            self.after_cancel(self.preview_task)
+        self.preview_task = self.after(self.preview_delay, self.request_font_preview)
+
+    def request_font_preview(self):
+        self.preview_task = None
+        selection = self.font_listbox.curselection()
+        if not selection:
+            return
+        font_name, font_path = self.font_list[selection[0]]
+        if not font_path.lower().endswith(('.ttf', '.otf')):
+            self.show_preview_unavailable()
+            return
+        self.preview_token += 1
+        if FontDialog.preview_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            FontDialog.preview_executor = ThreadPoolExecutor(max_workers=1)
+        future = self.preview_executor.submit(render_font_preview, font_path)
+        if self.poll_task is not None:
+            self.after_cancel(self.poll_task)  # 이전 폰트를 기다리던 폴링은 필요 없음
+        self.poll_task = self.after(10, self.poll_font_preview, future, self.preview_token)
+
+    def poll_font_preview(self, future, token):
+        self.poll_task = None
+        if not future.done():
+            self.poll_task = self.after(10, self.poll_font_preview, future, token)
+            return
+        if token != self.preview_token:
+            return  # 그리는 동안 다른 폰트가 선택됨
+        try:
+            img = future.result()
+        except Exception:
+            self.show_preview_unavailable()
+            return
+        from PIL import ImageTk
+        self.preview_canvas.delete("all")
+        self.preview_image = ImageTk.PhotoImage(img)
+        self.preview_canvas.create_image(0, 0, anchor="nw", image=self.preview_image)
+
+    def show_preview_unavailable(self):
+        self.preview_canvas.delete("all")
+        self.preview_canvas.create_text(150, 25, text="미리보기 불가\n(하지만 적용 가능합니다.)", fill="red")
 
     def select_font(self):
         selection = self.font_listbox.curselection()
@@ -157,14 +2396,349 @@ class FontDialog(tk.Toplevel):
             self.selected_font = (font_name, font_path)
             self.destroy()
 
+class TimerPanel(tk.Frame):
+    """
+    여러 타이머 창 안의 타이머 하나. 상태와 카운트다운 끝의 깜빡임은 TimerMachine, 그리기는 DigitCellRenderer가 맡고,
+    갱신은 창이 공유하는 HeapScheduler로 예약합니다. 글자 색, 테두리, 배경 색, 글자 크기는 타이머마다 따로 바꿀 수 있습니다.
+    """
+    def __init__(self, parent, scheduler, style, on_remove, bg):
+        super().__init__(parent, bg=bg, borderwidth=1, relief="groove")
+        self.machine = TimerMachine(scheduler, on_change=self.render, on_adjust=self.render, on_stop=self.render, on_blink=self.set_covered)
+        self.machine.core.football_mode = style.football_mode
+        self.on_remove = on_remove
+        self.bg = bg
+        self.photo = None
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.canvas.grid(row=0, column=0, columnspan=4)
+        self.image_item = self.canvas.create_image(0, 0, anchor="nw")
+        self.cover_item = self.canvas.create_rectangle(0, 0, 0, 0, fill=bg, outline=bg, state="hidden")  # 깜빡일 때 덮는 사각형
+
+        tk.Button(self, text="스탑워치", command=lambda: self.machine.toggle(1)).grid(row=1, column=0, sticky="ew")
+        tk.Button(self, text="카운트다운", command=lambda: self.machine.toggle(-1)).grid(row=1, column=1, sticky="ew")
+        tk.Button(self, text="분 +1", command=lambda: self.machine.adjust(1, 'minutes')).grid(row=1, column=2, sticky="ew")
+        tk.Button(self, text="분 -1", command=lambda: self.machine.adjust(-1, 'minutes')).grid(row=1, column=3, sticky="ew")
+        tk.Button(self, text="초기화", command=self.reset).grid(row=2, column=0, sticky="ew")
+
+        # 이 타이머만의 스타일
+        self.outline_var = tk.IntVar(value=1 if style.outline_enabled else 0)
+        style_button = tk.Menubutton(self, text="스타일", relief="raised")
+        menu = tk.Menu(style_button, tearoff=0)
+        menu.add_command(label="글자 색...", command=lambda: self.choose_color("fill", "글씨 색 선택"))
+        menu.add_command(label="테두리 색...", command=lambda: self.choose_color("outline", "테두리 색 선택"))
+        menu.add_checkbutton(label="테두리", variable=self.outline_var, command=lambda: self.set_style(outline_enabled=bool(self.outline_var.get())))
+        menu.add_command(label="배경 색...", command=self.choose_background)
+        menu.add_separator()
+        menu.add_command(label="글자 크게", command=lambda: self.set_style(font_size=self.style.font_size + 4))
+        menu.add_command(label="글자 작게", command=lambda: self.set_style(font_size=max(8, self.style.font_size - 4)))
+        style_button.configure(menu=menu)
+        style_button.grid(row=2, column=1, columnspan=2, sticky="ew")
+        tk.Button(self, text="삭제", command=self.remove).grid(row=2, column=3, sticky="ew")
+        self.style = style
+        self.set_style()
+
+    def set_style(self, **changes):
+        # 스타일을 바꾸고 글자에 맞춰 크기를 다시 잰 뒤 새 렌더러로 다시 그림
+        style = self.style._replace(**changes)
+        thickness = style.thickness if style.outline_enabled else 0
+        self.style = style._replace(size=measure_text(style.font_path, style.font_size, thickness, text_shape(self.machine.core.text())))
+        self.cells = DigitCellRenderer(self.style)  # 같은 스타일의 타이머끼리 글리프 아틀라스를 공유함
+        self.photo = None
+        width, height = self.style.size
+        self.canvas.configure(width=width, height=height)
+        self.canvas.coords(self.cover_item, 0, 0, width, height)
+        self.render()
+
+    def choose_color(self, field, title):
+        color = colorchooser.askcolor(title=title, parent=self)[1]
+        if color:
+            self.set_style(**{field: color})
+
+    def choose_background(self):
+        color = colorchooser.askcolor(title="배경 색 선택", parent=self)[1]
+        if color:
+            self.bg = color
+            self.configure(bg=color)
+            self.canvas.configure(bg=color)
+            self.canvas.itemconfigure(self.cover_item, fill=color, outline=color)
+
+    def render(self):
+        self.cells.update(self.machine.core.text())
+        if self.photo is None:
+            from PIL import ImageTk
+            self.photo = ImageTk.PhotoImage(self.cells.frame)
+            self.canvas.itemconfigure(self.image_item, image=self.photo)
+        else:
+            self.photo.paste(self.cells.frame)
+
+    def set_covered(self, covered):
+        # 카운트다운이 끝났을 때 TimerMachine.blink가 부름 (깜빡이는 중에 삭제된 타이머는 무시)
+        if self.winfo_exists():
+            self.canvas.itemconfigure(self.cover_item, state="normal" if covered else "hidden")
+
+    def cancel(self):
+        # 예약된 틱을 취소하고 멈춤 (창을 닫거나 타이머를 삭제할 때)
+        self.machine.shutdown()
+
+    def reset(self):
+        self.machine.reset()
+        self.set_covered(False)
+        self.render()
+
+    def remove(self):
+        self.cancel()
+        self.on_remove(self)
+        self.destroy()
+
+class MultiTimerWindow(tk.Toplevel):
+    """
+    여러 개의 독립된 스탑워치/카운트다운/축구 타이머를 한 창에서 실행합니다.
+    모든 타이머가 하나의 HeapScheduler를 공유하므로 가장 먼저 갱신할 타이머의 시각에만 깨어납니다.
+    """
+    columns = 4
+
+    def __init__(self, parent, style, bg):
+        super().__init__(parent)
+        self.title("여러 타이머")
+        self.style = style
+        self.bg = bg
+        self.scheduler = HeapScheduler(self)
+        self.panels = []
+
+        toolbar = tk.Frame(self)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
+        tk.Button(toolbar, text="타이머 추가", command=lambda: self.add_timer(False)).pack(side=tk.LEFT)
+        tk.Button(toolbar, text="축구 타이머 추가", command=lambda: self.add_timer(True)).pack(side=tk.LEFT)
+
+        # 타이머가 많아도 볼 수 있도록 스크롤되는 영역
+        self.scroll_canvas = tk.Canvas(self, highlightthickness=0, width=800, height=400)
+        scrollbar = tk.Scrollbar(self, orient="vertical", command=self.scroll_canvas.yview)
+        self.scroll_canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scroll_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.panel_frame = tk.Frame(self.scroll_canvas)
+        self.scroll_canvas.create_window(0, 0, anchor="nw", window=self.panel_frame)
+        self.panel_frame.bind("<Configure>", lambda event: self.scroll_canvas.configure(scrollregion=self.scroll_canvas.bbox("all")))
+
+        self.add_timer(False)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+
+    def destroy(self):
+        # 창을 닫거나 프로그램이 끝날 때: 실행 중인 타이머의 예약과 공유 스케줄러의 Tk 타이머를 먼저 취소
+        for panel in self.panels:
+            panel.cancel()
+        self.scheduler.close()
+        super().destroy()
+
+    def add_timer(self, football_mode):
+        # 새 타이머는 메인 창의 스타일로 시작하고, 그 뒤로는 타이머마다 따로 바꿈
+        style = self.style._replace(football_mode=football_mode, decimals=0)
+        panel = TimerPanel(self.panel_frame, self.scheduler, style, self.remove_timer, self.bg)
+        self.panels.append(panel)
+        self.layout()
+
+    def remove_timer(self, panel):
+        self.panels.remove(panel)
+        self.layout()
+
+    def layout(self):
+        for index, panel in enumerate(self.panels):
+            panel.grid(row=index // self.columns, column=index % self.columns, padx=2, pady=2)
+
+class LapListView(tk.Frame):
+    """
+    랩 목록을 보이는 줄만 그리는 가상 목록입니다. 랩이 몇 개든 캔버스에는 화면에 보이는 줄 수만큼의
+    글자 아이템만 두고, 스크롤하면 그 아이템들의 글자만 바꿉니다.
+    """
+    row_height = 20
+
+    def __init__(self, parent, laps, format_value):
+        super().__init__(parent)
+        self.laps = laps
+        self.format_value = format_value
+        self.first = 0  # 맨 위에 보이는 랩 번호(0부터)
+        self.follow = True  # 맨 아래를 보고 있으면 새 랩을 따라감
+        self.rows = []  # 줄마다 (번호, 랩 시간, 누적 시간) 글자 아이템
+        self.refresh_task = None
+
+        self.canvas = tk.Canvas(self, width=360, height=400, bg="white", highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<MouseWheel>", lambda event: self.scroll_to(self.first - event.delta // 120 * 3))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_to(self.first - 3))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_to(self.first + 3))
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.laps)))
+        elif unit == "pages":
+            self.scroll_to(self.first + int(amount) * self.visible_rows())
+        else:
+            self.scroll_to(self.first + int(amount))
+
+    def scroll_to(self, first):
+        visible = self.visible_rows()
+        self.first = max(0, min(first, len(self.laps) - visible))
+        self.follow = self.first + visible >= len(self.laps)
+        self.refresh()
+
+    def request_refresh(self):
+        # 랩을 빠르게 연달아 눌러도 idle 때 한 번만 다시 그림
+        if self.refresh_task is None:
+            self.refresh_task = self.after_idle(self.refresh)
+
+    def refresh(self):
+        self.refresh_task = None
+        visible = self.visible_rows()
+        count = len(self.laps)
+        if self.follow:
+            self.first = max(0, count - visible)
+
+        # 보이는 줄 수가 바뀐 경우에만 아이템을 더 만들거나 지움
+        while len(self.rows) < visible:
+            y = len(self.rows) * self.row_height + 2
+            self.rows.append(tuple(self.canvas.create_text(x, y, anchor=anchor, font=("Courier", 11))
+                                   for x, anchor in ((40, "ne"), (200, "ne"), (350, "ne"))))
+        while len(self.rows) > visible:
+            for item in self.rows.pop():
+                self.canvas.delete(item)
+
+        for offset, items in enumerate(self.rows):
+            index = self.first + offset
+            if index < count:
+                number, lap_time, split = self.laps.lap(index)
+                texts = (str(number), self.format_value(lap_time), self.format_value(split))
+            else:
+                texts = ("", "", "")
+            for item, text in zip(items, texts):
+                self.canvas.itemconfigure(item, text=text)
+
+        if count:
+            self.scrollbar.set(self.first / count, min(1.0, (self.first + visible) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+class LapListWindow(tk.Toplevel):
+    """
+    랩 목록 창. 목록은 LapListView로 보이는 줄만 그리고, 내보내기는 작업 스레드에서 CSV 또는 JSON Lines로 한 줄씩 씁니다.
+    """
+    def __init__(self, parent, laps, football_mode):
+        super().__init__(parent)
+        self.title("랩 기록")
+        self.laps = laps
+        self.football_mode = football_mode  # 현재 축구 모드인지 돌려주는 함수
+
+        toolbar = tk.Frame(self)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
+        tk.Button(toolbar, text="내보내기", command=self.export).pack(side=tk.LEFT)
+        self.count_label = tk.Label(toolbar, anchor="e")
+        self.count_label.pack(side=tk.RIGHT)
+
+        self.view = LapListView(self, laps, lambda value: format_time(value, self.football_mode(), 2))
+        self.view.pack(fill=tk.BOTH, expand=True)
+        self.request_refresh()
+
+    def request_refresh(self):
+        self.count_label.configure(text=f"{len(self.laps)}개")
+        self.view.request_refresh()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(parent=self, title="랩 기록 내보내기", defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if path:
+            # 랩이 많아도 창이 멈추지 않도록 작업 스레드에서 한 줄씩 씀 (Tk 변수는 여기서 미리 읽음)
+            Thread(target=self.laps.export, args=(path, self.football_mode()), daemon=True).start()
+
+class MirrorWindow(tk.Toplevel):
+    """
+    운영 창의 타이머를 그대로 보여 주는 창(다른 모니터의 전체 화면용). 직접 그리지 않고 TimerApp이 한 번 그린 이미지를 표시만 합니다.
+    F11로 전체 화면을 켜고 끄며, Esc로 전체 화면을 끕니다.
+    """
+    def __init__(self, parent, bg, on_resize, on_close):
+        super().__init__(parent)
+        self.title("타이머 화면")
+        self.geometry(f"{parent.winfo_width()}x{parent.winfo_height()}")
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.text_item = self.canvas.create_text(0, 0, anchor="center", state="hidden")
+        self.cover_item = self.canvas.create_rectangle(0, 0, 0, 0, state="hidden")
+        self.shown = None  # 지금 표시 중인 이미지 구성 (같으면 아이템을 다시 만들지 않음)
+        self.images = []
+
+        self.canvas.bind("<Configure>", lambda event: on_resize())
+        self.bind("<F11>", lambda event: self.attributes("-fullscreen", not self.attributes("-fullscreen")))
+        self.bind("<Escape>", lambda event: self.attributes("-fullscreen", False))
+        self.protocol("WM_DELETE_WINDOW", lambda: on_close(self))
+
+    def size(self):
+        return self.canvas.winfo_width(), self.canvas.winfo_height()
+
+    def scale(self, operator_size):
+        # 운영 창의 캔버스와 크기가 같으면 1, 다르면 가로세로 중 덜 늘어나는 쪽 비율
+        size = self.size()
+        if size == operator_size or size[0] <= 1 or operator_size[0] <= 1 or operator_size[1] <= 1:
+            return 1.0
+        return min(size[0] / operator_size[0], size[1] / operator_size[1])
+
+    def show_images(self, images, boxes, frame_size):
+        """
+        images를 boxes 위치에 놓아 frame_size 크기의 그림을 가운데에 표시합니다.
+        구성이 같으면 아무것도 하지 않습니다. 이미 붙어 있는 PhotoImage의 픽셀이 바뀌면 이 창에도 그대로 보입니다.
+        """
+        key = (tuple(map(id, images)), tuple(boxes), frame_size, self.size())
+        if key == self.shown:
+            return
+        self.canvas.delete("mirror")
+        width, height = self.size()
+        x0, y0 = (width - frame_size[0]) // 2, (height - frame_size[1]) // 2
+        for image, box in zip(images, boxes):
+            self.canvas.create_image(x0 + box[0], y0 + box[1], anchor="nw", image=image, tags="mirror")
+        self.canvas.itemconfigure(self.text_item, state="hidden")
+        self.canvas.tag_raise(self.cover_item)
+        self.shown = key
+        self.images = list(images)  # 표시하는 동안 이미지가 사라지지 않도록 참조를 잡아 둠
+
+    def show_text(self, text, font, fill):
+        if self.shown is not None:
+            self.canvas.delete("mirror")
+            self.shown = None
+            self.images = []
+        width, height = self.size()
+        self.canvas.itemconfigure(self.text_item, text=text, font=font, fill=fill, state="normal")
+        self.canvas.coords(self.text_item, width // 2, height // 2)
+
+    def set_covered(self, covered):
+        # 운영 창과 함께 깜빡임
+        if covered:
+            bg = self.canvas.cget("bg")
+            self.canvas.coords(self.cover_item, 0, 0, *self.size())
+            self.canvas.itemconfigure(self.cover_item, fill=bg, outline=bg, state="normal")
+            self.canvas.tag_raise(self.cover_item)
+        else:
+            self.canvas.itemconfigure(self.cover_item, state="hidden")
+
 class TimerApp:
-    def __init__(self, root):
+    def __init__(self, root, control_address=None, metrics_log=None, show_metrics=False, clock=time.monotonic, scheduler=None, state_dir=None,
+                 outline_mode="stroke"):
         self.root = root
         self.root.title("스탑워치 및 카운트다운용 타이머")
-        self.timer_task = None  # timer_task 변수 정의
 
-        self.current_image = None
-        self.next_image = None
+        self.renderer = None  # 화면과 무관한 렌더러 (TimerRenderer)
+        self.render_task = None  # 예약된 그리기 (request_render)
+        self.canvas_size = (0, 0)  # 마지막으로 자리 잡은 캔버스 크기
+        self.resize_task = None
+        self.resize_delay = 150  # 창 크기 변경이 이 시간(ms) 동안 멈추면 다시 그림
+        self.cell_renderer = None  # 바뀐 칸만 다시 그리는 렌더러 (DigitCellRenderer)
+        self.frame_pipeline = FramePipeline()  # 실행 방향으로 다음 프레임을 미리 그려 두는 작업 스레드
+        self.tile_boxes = []  # 셀마다 Tk 이미지 하나와 캔버스 아이템 하나를 두고 픽셀만 덮어씀
+        self.tile_images = []
+        self.tile_items = []
+        self.tile_origin = None
 
         # 초기 창 크기 설정
         self.default_width = 600
@@ -172,18 +2746,19 @@ class TimerApp:
         self.root.geometry(f"{self.default_width}x{self.default_height}")
         self.root.minsize(self.default_width, self.default_height)
 
-        # 타이머 변수들
-        self.hours = 0
-        self.minutes = 0
-        self.seconds = 0
-        self.is_running = False
+        # 타이머 상태 기계: 시계와 스케줄러(기본은 Tk after)를 바꿔 끼울 수 있음
+        self.timer = TimerMachine(scheduler or root, clock, on_change=self.update_display, on_adjust=self.timer_adjusted,
+                                  on_stop=self.frame_pipeline.invalidate, on_blink=self.blink_timer, on_segment=self.show_segment)
+        self.schedule_path = None  # 불러온 일정 파일 (설정에 저장해 다음 실행에서 이어 감)
         self.stop_event = Event()
 
         # 기본 폰트 크기 설정
         self.default_font_size = 48
         self.border_thickness = 2  # 기본 테두리 두께
+        self.outline_mode = outline_mode  # 외곽선 그리기 방식 (OUTLINE_MODES 참고, --outline-mode)
         self.font_family = "arial"  # 기본 폰트 패밀리 (시스템 폰트 이름 사용)
-        self.font_path = get_font_path_from_registry(self.font_family)  # 기본 폰트 파일 경로
+        self.font_path = None  # 기본 폰트 파일 경로는 창을 띄운 뒤에 찾음 (resolve_default_font)
+        self.font_ready = False  # 그 전까지는 Tk 기본 글꼴로 그림
         self.border_color = "white"
         self.fg_color = "black"
         self.bg_color = "#A9A9A9"
@@ -193,6 +2768,12 @@ class TimerApp:
         self.timer_canvas = tk.Canvas(root, bg=self.bg_color, highlightthickness=0)
         self.timer_canvas.grid(row=0, column=0, columnspan=3, pady=0, sticky="nsew")
 
+        # 캔버스 아이템은 한 번만 만들고 이후에는 내용과 위치만 바꿈 (셀 이미지 아이템은 "digits" 태그)
+        self.text_item = self.timer_canvas.create_text(0, 0, anchor="center")
+        self.blink_item = self.timer_canvas.create_rectangle(0, 0, 0, 0, state="hidden")
+        self.metrics_item = self.timer_canvas.create_text(6, 6, anchor="nw", font=("Courier", 9), state="hidden")
+        self.segment_item = self.timer_canvas.create_text(0, 6, anchor="n", font=("Arial", 14, "bold"), state="hidden")  # 일정의 현재 구간
+
         # 버튼 프레임
         button_frame = tk.Frame(root, bg=self.button_color)
         button_frame.grid(row=1, column=0, columnspan=3, pady=0, sticky="sew")
@@ -240,9 +2821,14 @@ class TimerApp:
         self.border_var = tk.IntVar(value=1)
         self.border_check = tk.Checkbutton(button_frame, text=" 글씨 테두리 넣기", variable=self.border_var, command=self.toggle_border, bg=self.button_color, anchor="w", borderwidth=0, relief="flat")
 
-        # 6행 1, 2열에 빈 레이블 추가
-        self.empty_label1 = tk.Label(button_frame, bg=self.button_color, borderwidth=0, relief="flat")
-        self.empty_label2 = tk.Label(button_frame, bg=self.button_color, borderwidth=0, relief="flat")
+        # 표시 단위 선택 (초 / 1/10초 / 1/100초)
+        self.precision_var = tk.StringVar(value="초 단위")
+        self.precision_menu = tk.OptionMenu(button_frame, self.precision_var, *DISPLAY_PRECISIONS, command=self.set_display_precision)
+        self.precision_menu.configure(bg=self.button_color, highlightthickness=0, borderwidth=0, relief="flat")
+
+        # 창 크기에 맞춰 폰트 크기를 자동으로 정하는 체크박스
+        self.auto_fit_var = tk.IntVar(value=0)
+        self.auto_fit_check = tk.Checkbutton(button_frame, text=" 창 크기에 맞추기", variable=self.auto_fit_var, command=self.request_render, bg=self.button_color, anchor="w", borderwidth=0, relief="flat")
         # 체크박스 추가
         self.football_mode_var = tk.IntVar(value=0)  # 0 = 일반 모드, 1 = 축구용 타이머 모드
         self.football_mode_check = tk.Checkbutton(button_frame, text=" 축구용 타이머", variable=self.football_mode_var, command=self.toggle_football_mode, bg=self.button_color, anchor="w", borderwidth=0, relief="flat")
@@ -272,10 +2858,30 @@ class TimerApp:
         self.font_select_btn.grid(row=5, column=1, sticky="ew")
         self.border_check.grid(row=5, column=2, sticky="ew",)
 
-        self.empty_label1.grid(row=6, column=0, sticky="news")
-        self.empty_label2.grid(row=6, column=1, sticky="news")
+        self.precision_menu.grid(row=6, column=0, sticky="news")
+        self.auto_fit_check.grid(row=6, column=1, sticky="news")
         self.football_mode_check.grid(row=6, column=2, sticky="news")
         
+        # 7행: 추가 기능 창
+        self.multi_timer_btn = tk.Button(button_frame, text="여러 타이머", command=self.open_multi_timer)
+        self.multi_timer_btn.grid(row=7, column=0, sticky="ew")
+        self.lap_btn = tk.Button(button_frame, text="랩", command=self.record_lap)
+        self.lap_btn.grid(row=7, column=1, sticky="ew")
+        self.lap_list_btn = tk.Button(button_frame, text="랩 목록", command=self.open_lap_list)
+        self.lap_list_btn.grid(row=7, column=2, sticky="ew")
+        self.lap_window = None
+
+        # 8행: 같은 타이머를 다른 창(모니터)에 함께 표시
+        self.mirror_btn = tk.Button(button_frame, text="화면 창 추가", command=self.add_mirror)
+        self.mirror_btn.grid(row=8, column=0, sticky="ew")
+        self.mirrors = []  # MirrorWindow 목록
+        self.scaled_images = {}  # 거울 창 크기별 확대 이미지 {(너비, 높이): PhotoImage}
+        self.mirror_fonts = {}  # 테두리 없이 표시할 때 거울 창의 Tk 글꼴 {(글꼴 이름, 크기): Font}
+        self.schedule_btn = tk.Button(button_frame, text="일정 불러오기", command=self.open_schedule)
+        self.schedule_btn.grid(row=8, column=1, sticky="ew")
+        self.clear_schedule_btn = tk.Button(button_frame, text="일정 해제", command=self.clear_schedule)
+        self.clear_schedule_btn.grid(row=8, column=2, sticky="ew")
+
         button_frame.grid_rowconfigure(0, weight=1)
         button_frame.grid_columnconfigure((0, 1, 2), weight=1)
 
@@ -285,10 +2891,6 @@ class TimerApp:
         self.root.update_idletasks()
         self.root.geometry(f"{self.default_width}x{self.default_height}")
 
-        # 버튼 누르기 이벤트
-        self.button_press_time = 0
-        self.button_hold_task = None
-
         # bind를 사용하여 클릭 및 길게 누르기 동작을 처리합니다.
         self.adjust_hour_up_btn.bind("<ButtonPress-1>", lambda event, unit='hours', amount=1: self.start_adjust_time(event, amount, unit))
         self.adjust_hour_down_btn.bind("<ButtonPress-1>", lambda event, unit='hours', amount=-1: self.start_adjust_time(event, amount, unit))
@@ -297,19 +2899,72 @@ class TimerApp:
         self.adjust_second_up_btn.bind("<ButtonPress-1>", lambda event, unit='seconds', amount=1: self.start_adjust_time(event, amount, unit))
         self.adjust_second_down_btn.bind("<ButtonPress-1>", lambda event, unit='seconds', amount=-1: self.start_adjust_time(event, amount, unit))
         
+        # 지난 실행의 설정과 타이머 상태 되살리기 (state_dir이 있을 때만)
+        self.settings_path = os.path.join(state_dir, 'settings.json') if state_dir else None
+        self.saved_settings = None
+        self.journal = None
+        self.state_lock = None
+        if state_dir:
+            try:
+                self.state_lock = lock_state_dir(state_dir)
+            except OSError as e:
+                print(f"Error locking state directory: {e}")
+        if state_dir and self.state_lock is None:
+            # 다른 창이 같은 폴더를 쓰는 중: 설정은 읽기만 하고 타이머 상태는 저장하지도 되살리지도 않음
+            print(f"State directory is in use by another instance; settings and timer state will not be saved: {state_dir}")
+            self.load_settings()
+            self.settings_path = None
+        elif state_dir:
+            self.load_settings()
+            self.journal = StateJournal(os.path.join(state_dir, 'timer_journal.bin'), scheduler=self.root)
+            try:
+                record = self.journal.open(compact=False)  # 압축(fsync)은 첫 화면을 그린 뒤 idle 때
+                self.root.after_idle(self.compact_journal)
+            except OSError as e:
+                print(f"Error opening timer journal: {e}")
+                self.journal = record = None
+            if record:
+                self.timer.restore(record, time.time())
+                self.football_mode_var.set(1 if self.timer.core.football_mode else 0)
+            self.timer.journal = self.journal
+
         # 폰트 설정
         self.custom_font = tkFont.Font(family=self.font_family, size=self.default_font_size, weight='bold')
         self.update_display()
 
-        # 프로그램 시작 시 폰트 크기 설정 액션 한 번 호출
-        self.root.after(100, self.set_font_size)
+        # 창이 뜬 뒤 idle 때 폰트 크기 설정 액션을 한 번 호출하고 기본 폰트 파일을 찾음
+        self.root.after_idle(self.set_font_size)
+        self.root.after_idle(self.resolve_default_font)
+
+        # 외부 제어 서버 (--control)
+        self.control_server = None
+        self.control_queue = queue.Queue()
+        self.last_published = None
+        if control_address:
+            self.control_server = ControlServer(control_address, self.control_queue)
+            self.control_server.start()
+            self.root.after(20, self.poll_control_commands)
+
+        # 틱/그리기 성능 측정 (F3으로 화면 표시 전환, --metrics-log로 파일 기록). 꺼져 있으면 None
+        self.metrics = None
+        self.metrics_log = metrics_log
+        self.metrics_task = None
+        self.metrics_interval = 1000  # 표시와 기록 주기(ms)
+        self.root.bind("<F3>", self.toggle_metrics)
+        if metrics_log or show_metrics:
+            self.enable_metrics(show_metrics)
+
+        # 창 크기 변경은 잠잠해진 뒤에 한 번만 다시 그림
+        self.timer_canvas.bind("<Configure>", self.on_canvas_resize)
 
         # 프로그램 종료 시 이벤트 처리
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def select_font(self):
-        font_list = get_installed_fonts()
-        font_dialog = FontDialog(self.root, font_list)
+        # 폰트 정보는 백그라운드에서 읽고, 창은 바로 띄워 읽히는 대로 채움
+        font_queue = queue.Queue()
+        Thread(target=scan_installed_fonts, args=(font_queue,), daemon=True).start()
+        font_dialog = FontDialog(self.root, [], font_queue)
         self.root.wait_window(font_dialog)
         if font_dialog.selected_font:
             font_name, font_path = font_dialog.selected_font
@@ -318,62 +2973,37 @@ class TimerApp:
             # print(f"Selected Font: {self.font_family}")
             # print(f"Font Path: {self.font_path}")
             self.custom_font = tkFont.Font(family=self.font_family, size=self.default_font_size, weight='bold')
-            self.update_display()
+            self.request_render()
             
     # 폰트 색 변경 기능 추가
     def change_font_color(self):
         color = colorchooser.askcolor(title="배경 색 선택")
         if color:
             self.fg_color = color[1]
-            self.update_display()
+            self.request_render()
 
     def start_adjust_time(self, event, amount, unit):
-        self.button_press_time = time.time()
-        self.adjust_amount = amount
-        self.adjust_unit = unit
-        self.is_holding = False
-        self.button_hold_task = self.root.after(500, self.trigger_hold_adjust)
+        # 짧게 누르면 한 번, 0.5초 넘게 누르고 있으면 반복해서 조정 (TimerMachine.press)
+        self.timer.press(amount, unit)
         event.widget.bind("<ButtonRelease-1>", self.stop_adjust_time)
 
-    def trigger_hold_adjust(self):
-        self.is_holding = True
-        self.hold_adjust_time()
-
-    def hold_adjust_time(self):
-        if not self.is_holding:
-            return
-
-        elapsed_time = time.time() - self.button_press_time
-
-        if elapsed_time >= 4:
-            amount = self.adjust_amount * 5  # 4초 이상일 때 5씩 증감
-        elif elapsed_time >= 2:
-            amount = self.adjust_amount * 2  # 2초 이상일 때 2씩 증감
-        else:
-            amount = self.adjust_amount  # 2초 미만일 때 1씩 증감
-
-        self.adjust_time(amount, self.adjust_unit)
-        self.button_hold_task = self.root.after(100, self.hold_adjust_time)
-
     def stop_adjust_time(self, event):
-        # 0.5초 이상 눌렀다면 추가 증감을 하지 않음
-        if not self.is_holding and time.time() - self.button_press_time < 0.5:
-            self.adjust_time(self.adjust_amount, self.adjust_unit)
-
-        self.is_holding = False
-
-        if self.button_hold_task:
-            self.root.after_cancel(self.button_hold_task)
-            self.button_hold_task = None
-
+        self.timer.release()
         event.widget.unbind("<ButtonRelease-1>")
 
+    def resolve_default_font(self):
+        # 기본 폰트 파일을 찾은 뒤(또는 그 전에 폰트를 골랐으면 그대로) 테두리 글자로 다시 그림
+        if self.font_path is None:
+            self.font_path = get_font_path_from_registry(self.font_family)
+        self.font_ready = True
+        self.request_render()
+
     def set_font_size(self):
         try:
             new_size = int(self.font_size_entry.get())
             self.default_font_size = new_size
             self.custom_font = tkFont.Font(family=self.font_family, size=self.default_font_size, weight='bold')
-            self.update_display()
+            self.request_render()
         except ValueError:
             pass  # 잘못된 값이 입력된 경우 무시
 
@@ -383,263 +3013,670 @@ class TimerApp:
             self.bg_color = color_code[1]
             self.root.configure(bg=self.bg_color)
             self.timer_canvas.configure(bg=self.bg_color)
+            for mirror in self.mirrors:
+                mirror.canvas.configure(bg=self.bg_color)
             self.font_size_entry.configure(bg="white")
             self.border_thickness_entry.configure(bg="white")
             # self.border_check.configure(bg=self.bg_color)
             # self.football_mode_check.configure(bg=self.bg_color)  # 축구모드 체크박스의 배경색 변경
-            # self.empty_label1.configure(bg=self.bg_color)
-            # self.empty_label2.configure(bg=self.bg_color)
-            self.update_display()
+            self.request_render()
 
     def change_fg_color(self):
         color_code = colorchooser.askcolor(title="글씨 색 선택")
         if color_code:
             self.fg_color = color_code[1]
-            self.update_display()
+            self.timer_canvas.itemconfigure(self.segment_item, fill=self.fg_color)
+            self.request_render()
 
     def change_border_color(self):
         color_code = colorchooser.askcolor(title="테두리 색 선택")
         if color_code:
             self.border_color = color_code[1]
-            self.update_display()
+            self.request_render()
 
     def set_border_thickness(self):
         try:
             self.border_thickness = int(self.border_thickness_entry.get())
-            self.update_display()
+            self.request_render()
         except ValueError:
             pass  # 잘못된 값이 입력된 경우 무시
 
     def toggle_border(self):
-        self.update_display()
+        self.request_render()
 
     def validate_time(self, input_value, max_value):
         num = int(input_value) if input_value.isdigit() else 0
         return max(0, min(num, max_value))
 
-    def update_display(self):
-        # 타이머 캔버스 초기화
-        self.timer_canvas.delete("all")
-        
-        if self.football_mode_var.get() == 1:
-            # 축구 모드일 때는 시간 부분을 제외하고, 60분 이상으로 표시
-            total_minutes = self.hours * 60 + self.minutes
-            time_text = f"{total_minutes:02}:{self.seconds:02}"
-        else:
-            time_text = f"{self.hours:02}:{self.minutes:02}:{self.seconds:02}"
-        
-        # 현재 이미지를 표시
-        if self.border_var.get():
-            self.draw_text_with_outline(self.timer_canvas, self.timer_canvas.winfo_width()//2, self.timer_canvas.winfo_height()//2, time_text, self.font_path, self.default_font_size, self.fg_color, self.border_color, self.border_thickness)
-        else:
-            self.timer_canvas.create_text(self.timer_canvas.winfo_width()//2, self.timer_canvas.winfo_height()//2, text=time_text, font=self.custom_font, fill=self.fg_color, anchor="center")
-        
-        # 다음 이미지를 미리 생성하여 저장
-        self.next_time_text = self.calculate_next_time()
-        self.next_image = self.create_image_for_next_time(self.next_time_text)
-
-    def draw_text_with_outline(self, canvas, x, y, text, font_path, font_size, fill, outline, thickness):
-        # 외곽선을 그리기 위해 Pillow 사용
-        img_width, img_height = 800, 200  # 이미지의 크기 조정
-        img = Image.new("RGBA", (img_width, img_height), (255, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        if not font_path:
-            font_path = get_font_path_from_registry(self.font_family)
-        
+    def on_canvas_resize(self, event):
+        # 드래그 중에는 아이템 위치만 옮기고, 다시 그리기는 크기 변경이 멈춘 뒤 한 번만 함
+        self.position_items(event.width // 2, event.height // 2)
+        if self.resize_task:
+            self.root.after_cancel(self.resize_task)
+        self.resize_task = self.root.after(self.resize_delay, self.on_resize_settled)
+
+    def on_resize_settled(self):
+        self.resize_task = None
+        self.canvas_size = (self.timer_canvas.winfo_width(), self.timer_canvas.winfo_height())
+        self.request_render()
+
+    def apply_auto_fit(self, font_path, text):
+        # 창에 들어가는 가장 큰 폰트 크기로 맞춤 (크기별 측정과 탐색 결과는 캐시됨)
+        width, height = self.canvas_size
+        if not self.auto_fit_var.get() or width <= 1 or height <= 1:
+            return
+        thickness = self.border_thickness if self.border_var.get() else 0
+        size = fit_font_size(font_path, thickness, text_shape(text), int(width * 0.95), int(height * 0.95))
+        if size != self.default_font_size:
+            self.default_font_size = size
+            self.font_size_entry.delete(0, tk.END)
+            self.font_size_entry.insert(0, str(size))
+            self.custom_font = tkFont.Font(family=self.font_family, size=self.default_font_size, weight='bold')
+
+    def current_style(self):
+        # 현재 위젯 설정을 렌더러 스타일로 변환
+        font_path = self.font_path or get_font_path_from_registry(self.font_family)
+        football_mode = self.football_mode_var.get() == 1
+        decimals = self.display_decimals()
+        value = self.display_value()
+        if self.timer.schedule is not None:
+            value = self.timer.schedule.peak  # 일정의 가장 긴 글자에 맞춰 두어 구간이 바뀌어도 스타일(크기)이 그대로임
+        text = format_time(value, football_mode, decimals)
+        self.apply_auto_fit(font_path, text)
+
+        # 그리기 영역은 글자 크기에 맞추고, 캔버스보다 크면 캔버스 크기로 자름
+        thickness = self.border_thickness if self.border_var.get() else 0
+        size = measure_text(font_path, self.default_font_size, thickness, text_shape(text))
+        if self.canvas_size[0] > 1 and self.canvas_size[1] > 1:
+            size = (min(size[0], self.canvas_size[0]), min(size[1], self.canvas_size[1]))
+
+        return TimerStyle(
+            font_path=font_path,
+            font_size=self.default_font_size,
+            fill=self.fg_color,
+            outline=self.border_color,
+            thickness=self.border_thickness,
+            outline_enabled=bool(self.border_var.get()),
+            football_mode=football_mode,
+            outline_mode=self.outline_mode,
+            size=size,
+            decimals=decimals,
+        )
+
+    def get_renderer(self):
+        # 스타일이 바뀌었을 때만 렌더러를 새로 만듦
+        style = self.current_style()
+        if self.renderer is None or self.renderer.style != style:
+            self.renderer = TimerRenderer(style)
+            self.frame_pipeline.invalidate()  # 이전 스타일로 미리 그린 프레임은 버림
+        return self.renderer
+
+    def request_render(self):
+        # 상태만 바꾸고 그리기는 예약: 버튼을 누르고 있거나 설정을 연달아 바꿔도 idle 때 한 번만 그림
+        if self.render_task is None:
+            self.render_task = self.root.after_idle(self.flush_render)
+
+    def flush_render(self):
+        self.render_task = None
+        self.update_display()
+        self.save_settings()  # 설정을 바꾸면 항상 여기를 거치므로 바뀐 경우에만 저장
+
+    def current_settings(self):
+        return {
+            "font_family": self.font_family,
+            "font_path": self.font_path,
+            "font_size": self.default_font_size,
+            "fg_color": self.fg_color,
+            "bg_color": self.bg_color,
+            "border_color": self.border_color,
+            "border_thickness": self.border_thickness,
+            "border": self.border_var.get(),
+            "precision": self.precision_var.get(),
+            "auto_fit": self.auto_fit_var.get(),
+            "schedule": self.schedule_path,
+        }
+
+    def save_settings(self):
+        if not self.settings_path:
+            return
+        settings = self.current_settings()
+        if settings == self.saved_settings:
+            return
+        try:
+            tmp_path = self.settings_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(settings, f, ensure_ascii=False)
+            os.replace(tmp_path, self.settings_path)
+            self.saved_settings = settings
+        except OSError as e:
+            print(f"Error writing settings: {e}")
+
+    def load_settings(self):
+        try:
+            with open(self.settings_path, encoding='utf-8') as f:
+                settings = json.load(f)
+        except (OSError, ValueError):
+            return  # 저장된 설정이 없거나 깨졌으면 기본값 사용
+        self.font_family = settings.get("font_family", self.font_family)
+        self.font_path = settings.get("font_path") or self.font_path
+        self.default_font_size = settings.get("font_size", self.default_font_size)
+        self.fg_color = settings.get("fg_color", self.fg_color)
+        self.bg_color = settings.get("bg_color", self.bg_color)
+        self.border_color = settings.get("border_color", self.border_color)
+        self.border_thickness = settings.get("border_thickness", self.border_thickness)
+        self.border_var.set(settings.get("border", 1))
+        if settings.get("precision") in DISPLAY_PRECISIONS:
+            self.precision_var.set(settings["precision"])
+            self.timer.set_decimals(self.display_decimals())
+        self.auto_fit_var.set(settings.get("auto_fit", 0))
+        if settings.get("schedule"):
+            self.load_schedule(settings["schedule"])  # 저널은 일정의 경과 시간으로 되살아남
+
+        self.root.configure(bg=self.bg_color)
+        self.timer_canvas.configure(bg=self.bg_color)
+        self.font_size_entry.delete(0, tk.END)
+        self.font_size_entry.insert(0, str(self.default_font_size))
+        self.border_thickness_entry.delete(0, tk.END)
+        self.border_thickness_entry.insert(0, str(self.border_thickness))
+        self.saved_settings = self.current_settings()
+
+    def compact_journal(self):
+        if self.journal is None:
+            return
         try:
-            pil_font = ImageFont.truetype(font_path, font_size)
-        except IOError:
-            pil_font = ImageFont.load_default()
+            self.journal.compact()
+        except OSError as e:
+            print(f"Error compacting timer journal: {e}")
 
-        bbox = draw.textbbox((0, 0), text, font=pil_font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        text_x = (img_width - text_width) // 2
-        text_y = (img_height - text_height) // 2
+    def update_display(self):
+        if self.render_task is not None:
+            # 지금 바로 그리므로 예약된 그리기는 필요 없음
+            self.root.after_cancel(self.render_task)
+            self.render_task = None
+
+        if not self.font_ready:
+            # 폰트 파일을 찾기 전의 첫 프레임은 폰트 파일을 읽지 않고 Tk 글꼴로 바로 그림
+            time_text = format_time(self.display_value(), self.football_mode_var.get() == 1, self.display_decimals())
+            self.timer_canvas.itemconfigure(self.text_item, text=time_text, font=self.custom_font, fill=self.fg_color, state="normal")
+            self.timer_canvas.coords(self.text_item, self.timer_canvas.winfo_width()//2, self.timer_canvas.winfo_height()//2)
+            return
 
-        # 텍스트 중심에 외곽선을 그리기 위해 네 방향으로 그린다.
-        for adj in range(-thickness, thickness+1):
-            draw.text((text_x+adj, text_y), text, font=pil_font, fill=outline)
-            draw.text((text_x, text_y+adj), text, font=pil_font, fill=outline)
+        metrics = self.metrics
+        if metrics is not None:
+            started = metrics.clock()
 
-        # 중심점에 텍스트 그리기
-        draw.text((text_x, text_y), text, font=pil_font, fill=fill)
+        renderer = self.get_renderer()
+        value = self.display_value()
+        time_text = renderer.text_for(value)
+        x, y = self.timer_canvas.winfo_width()//2, self.timer_canvas.winfo_height()//2
 
-        # 이미지 변환
-        self.tk_image = ImageTk.PhotoImage(img)
-        canvas.create_image(x, y, image=self.tk_image, anchor="center")
+        # 초 단위로 실행 중일 때는 작업 스레드가 미리 그려 둔 프레임을 바꿔 끼움 (일정이 있으면 경과 시간으로 찾음)
+        use_pipeline = self.timer.core.is_running and self.border_var.get() and not self.display_decimals()
+        position = value if self.timer.schedule is None else self.timer.core.get_total_seconds()
+        frame = None
+        if use_pipeline:
+            ready = self.frame_pipeline.take(renderer.style, position)
+            if ready and ready[0] == time_text:
+                frame = ready[1]
 
-    def create_image_for_next_time(self, next_time_text):
-        # 다음 텍스트 이미지를 생성하여 반환
-        img_width, img_height = 800, 200  # 이미지의 크기 조정
-        img = Image.new("RGBA", (img_width, img_height), (255, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        pil_font = ImageFont.truetype(self.font_path, self.default_font_size)
-        bbox = draw.textbbox((0, 0), next_time_text, font=pil_font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        text_x = (img_width - text_width) // 2
-        text_y = (img_height - text_height) // 2
-
-        for adj in range(-self.border_thickness, self.border_thickness+1):
-            draw.text((text_x+adj, text_y), next_time_text, font=pil_font, fill=self.border_color)
-            draw.text((text_x, text_y+adj), next_time_text, font=pil_font, fill=self.border_color)
-
-        draw.text((text_x, text_y), next_time_text, font=pil_font, fill=self.fg_color)
-        return ImageTk.PhotoImage(img)
-
-    def calculate_next_time(self):
-        # 현재 시간에서 다음 시간을 계산하여 텍스트로 반환
-        next_seconds = (self.seconds + 1) % 60
-        next_minutes = self.minutes + (1 if next_seconds == 0 else 0)
-        next_minutes %= 60
-        next_hours = self.hours + (1 if next_minutes == 0 and next_seconds == 0 else 0)
-
-        if self.football_mode_var.get() == 1:
-            return f"{next_minutes:02}:{next_seconds:02}"
+        # 현재 이미지를 표시
+        changed = True
+        if self.border_var.get():
+            changed = self.draw_text_with_outline(self.timer_canvas, x, y, time_text, frame)
+            self.timer_canvas.itemconfigure("digits", state="normal")
+            self.timer_canvas.itemconfigure(self.text_item, state="hidden")
         else:
-            next_minutes %= 60
-            next_hours = self.hours + (1 if next_minutes == 0 and next_seconds == 0 else 0)
-        return f"{next_hours:02}:{next_minutes:02}:{next_seconds:02}"
-
-    def stopwatch(self):
-        self.seconds += 1
-        if self.seconds >= 60:
-            self.minutes += 1
-            self.seconds = 0
-        if self.minutes >= 60:
-            if self.football_mode_var.get() == 0:
-                self.hours += 1
-                self.minutes = 0
-        self.update_display()
+            self.timer_canvas.itemconfigure(self.text_item, text=time_text, font=self.custom_font, fill=self.fg_color, state="normal")
+            self.timer_canvas.coords(self.text_item, x, y)
+            self.timer_canvas.itemconfigure("digits", state="hidden")
+        self.timer_canvas.itemconfigure(self.blink_item, state="hidden")
+        if self.mirrors:
+            self.update_mirrors(time_text, changed)
+
+        if use_pipeline:
+            self.frame_pipeline.prime(renderer.style, self.timer.core.tick_direction, position, self.timer.schedule)
+
+        if self.control_server and time_text != self.last_published:
+            self.control_server.publish(value, time_text)
+            self.last_published = time_text
+
+        if metrics is not None:
+            metrics.record_render(started)
+
+    def get_cell_renderer(self):
+        style = self.get_renderer().style
+        if self.cell_renderer is None or self.cell_renderer.style != style:
+            self.cell_renderer = DigitCellRenderer(style)
+        return self.cell_renderer
+
+    def draw_text_with_outline(self, canvas, x, y, text, frame=None):
+        # 미리 그려 둔 글리프로 바뀐 칸만 다시 그리고(또는 미리 그린 frame으로 바꿔 끼우고), 그 칸의 Tk 이미지에만 픽셀을 올림
+        # 픽셀이 하나라도 바뀌었으면 True를 반환
+        cells = self.get_cell_renderer()
+        dirty = cells.update(text, frame)
+        metrics = self.metrics
+        if metrics is not None:
+            upload_started = metrics.clock()
+
+        changed = bool(dirty)
+        if cells.tiles != self.tile_boxes:
+            # 칸 배치가 바뀐 경우(스타일, 자릿수, 축구 모드 변경)에만 Tk 이미지와 아이템을 새로 만듦
+            changed = True
+            from PIL import ImageTk  # 첫 테두리 글자를 그릴 때 가져옴
+            canvas.delete("digits")
+            self.tile_boxes = list(cells.tiles)
+            self.tile_images = [ImageTk.PhotoImage(cells.frame.crop(box)) for box in self.tile_boxes]
+            self.tile_items = [canvas.create_image(0, 0, anchor="nw", image=image, tags="digits") for image in self.tile_images]
+            canvas.tag_raise(self.metrics_item)
+            canvas.tag_raise(self.blink_item)
+            self.tile_origin = None
+        else:
+            for index in dirty:
+                self.tile_images[index].paste(cells.frame.crop(self.tile_boxes[index]))
+        if metrics is not None:
+            metrics.record_upload(upload_started)
+
+        self.position_items(x, y)
+        return changed
+
+    def add_mirror(self):
+        self.mirrors.append(MirrorWindow(self.root, self.bg_color, self.request_render, self.remove_mirror))
+
+    def remove_mirror(self, mirror):
+        self.mirrors.remove(mirror)
+        mirror.destroy()
+
+    def update_mirrors(self, time_text, changed):
+        """
+        한 번 그린 프레임을 같은 틱 안에서 모든 거울 창에 나눠 줍니다.
+        운영 창과 같은 크기의 거울은 칸 Tk 이미지를 그대로 함께 쓰므로 추가 비용이 없고,
+        크기가 다른 거울은 크기별로 한 번만 확대한 이미지를 같은 크기의 거울끼리 나눠 씁니다.
+        """
+        operator_size = (self.timer_canvas.winfo_width(), self.timer_canvas.winfo_height())
+        if not self.border_var.get() or self.cell_renderer is None:
+            for mirror in self.mirrors:
+                key = (self.font_family, max(1, round(self.default_font_size * mirror.scale(operator_size))))
+                if key not in self.mirror_fonts:
+                    self.mirror_fonts[key] = tkFont.Font(family=key[0], size=key[1], weight='bold')
+                mirror.show_text(time_text, self.mirror_fonts[key], self.fg_color)
+                mirror.set_covered(False)
+            return
 
-    def countdown(self):
-        if self.hours == 0 and self.minutes == 0 and self.seconds == 0:
-            self.stop_timer()  # 타이머를 완전히 멈추도록 설정
-            self.blink_timer()  # 깜빡임 시작
+        from PIL import ImageTk
+        frame = self.cell_renderer.frame
+        used = {}
+        for mirror in self.mirrors:
+            scale = mirror.scale(operator_size)
+            size = (max(1, round(frame.width * scale)), max(1, round(frame.height * scale)))
+            if size == frame.size:
+                mirror.show_images(self.tile_images, self.tile_boxes, frame.size)
+            else:
+                if size not in used:
+                    photo = self.scaled_images.get(size)
+                    if photo is None:
+                        photo = ImageTk.PhotoImage(frame.resize(size, Image.BILINEAR))
+                    elif changed:
+                        photo.paste(frame.resize(size, Image.BILINEAR))
+                    used[size] = photo
+                mirror.show_images([used[size]], [(0, 0) + size], size)
+            mirror.set_covered(False)
+        self.scaled_images = used  # 더 이상 쓰지 않는 크기의 이미지는 버림
+
+    def position_items(self, x, y):
+        # 셀 이미지들과 글자 아이템을 (x, y) 가운데로 옮김 (다시 그리지 않음)
+        self.timer_canvas.coords(self.text_item, x, y)
+        self.timer_canvas.coords(self.segment_item, x, 6)
+        if self.cell_renderer is None:
             return
-        if self.seconds > 0:
-            self.seconds -= 1
-        elif self.minutes > 0:
-            self.minutes -= 1
-            self.seconds = 59
-        elif self.hours > 0:
-            if self.football_mode_var.get() == 0:
-                self.hours -= 1
-                self.minutes = 59
-                self.seconds = 59
-        self.update_display()
+        frame = self.cell_renderer.frame
+        origin = (x - frame.width // 2, y - frame.height // 2)
+        if origin != self.tile_origin:
+            for item, box in zip(self.tile_items, self.tile_boxes):
+                self.timer_canvas.coords(item, origin[0] + box[0], origin[1] + box[1])
+            self.tile_origin = origin
+
+    def display_decimals(self):
+        return DISPLAY_PRECISIONS[self.precision_var.get()]
 
-    # 타이머 동작 버튼을 새로 누르는 순간에 타이머에 떠있던 시간을 기준으로 시작하도록 수정
+    def display_value(self):
+        return self.timer.display_value()
+
+    def set_display_precision(self, _=None):
+        # 실행 중이면 다음 틱부터 새 갱신 주기로 동작
+        self.timer.set_decimals(self.display_decimals())
+        self.request_render()
+
+    # 타이머 동작은 TimerMachine이 맡고, 여기서는 버튼과 화면만 연결
     def start_stopwatch(self):
-        if self.is_running:
-            self.stop_timer()  # 기존 타이머 작업이 있으면 중지
-        else:
-            # 스톱워치 시작
-            self.is_running = True
-            self.update_display()  # 현재 시간 이미지를 표시하고, 다음 시간 이미지 생성
-            self.timer_task = self.root.after(1000, self.update_stopwatch)  # 1초 대기 후 타이머 시작
+        self.timer.toggle(1)
 
     def start_countdown(self):
-        if self.is_running:
-            self.stop_timer()  # 기존 타이머 작업이 있으면 중지
-        else:
-            # 카운트다운 시작
-            self.is_running = True
-            self.update_display()  # 현재 시간 이미지를 표시하고, 다음 시간 이미지 생성
-            self.timer_task = self.root.after(1000, self.update_countdown)  # 1초 대기 후 타이머 시작
+        self.timer.toggle(-1)
 
     def stop_timer(self):
-        if self.timer_task:  # 기존 타이머 작업이 있으면 중지
-            self.root.after_cancel(self.timer_task)
-            self.timer_task = None
-        self.is_running = False
+        self.timer.stop()
 
     def reset_timer(self):
-        self.stop_timer()  # 타이머 중지
-
-        # 타이머 시간 초기화
-        self.hours = 0
-        self.minutes = 0
-        self.seconds = 0
-        self.update_display()
+        self.timer.reset()  # 타이머 중지 후 시간 초기화 (랩 기록도 지움)
+        self.request_render()
+        self.refresh_lap_list()
 
+    def record_lap(self):
+        if self.timer.lap() is not None:
+            self.refresh_lap_list()
 
-    # 타이머 일시정지 및 시작 기능 추가
-    def update_stopwatch(self):
-        if self.is_running:
-            self.stopwatch()
-            self.timer_task = self.root.after(1000, self.update_stopwatch)  # 1초 대기 후 다음 시간 갱신
+    def open_lap_list(self):
+        if self.lap_window is not None and self.lap_window.winfo_exists():
+            self.lap_window.lift()
+            return
+        self.lap_window = LapListWindow(self.root, self.timer.laps, lambda: self.football_mode_var.get() == 1)
 
-    def update_countdown(self):
-        if self.is_running:
-            self.countdown()
-            if self.is_running:  # 카운트다운이 종료되지 않았으면 계속 진행
-                self.timer_task = self.root.after(1000, self.update_countdown)
+    def refresh_lap_list(self):
+        if self.lap_window is not None and self.lap_window.winfo_exists():
+            self.lap_window.request_refresh()
 
     def adjust_time(self, amount, unit):
-        if unit == 'hours':
-            if self.football_mode_var.get() == 1:  # 축구 타이머 모드
-                return  # 시간 증감 무효화
-            self.hours = max(0, self.hours + amount)  # 음수로 내려가지 않도록 수정
-        elif unit == 'minutes':
-            if self.football_mode_var.get() == 1:  # 축구 타이머 모드
-                self.minutes += amount  # 분을 계속 증가시키도록
-                if self.minutes < 0:
-                    self.minutes = 0  # 분이 음수가 되지 않도록
-            else:
-                self.minutes += amount
-                if self.minutes >= 60:
-                    self.minutes -= 60
-                    self.hours = max(0, self.hours + 1)
-                elif self.minutes < 0:
-                    if self.hours > 0:
-                        self.minutes += 60
-                        self.hours = max(0, self.hours - 1)
-                    else:
-                        self.minutes = 0  # 음수일 때 0분으로 돌려줌
-        elif unit == 'seconds':
-            self.seconds += amount
-            if self.seconds >= 60:
-                self.seconds -= 60
-                self.adjust_time(1, 'minutes')
-            elif self.seconds < 0:
-                if self.minutes > 0 or self.hours > 0:
-                    self.seconds += 60
-                    self.adjust_time(-1, 'minutes')
-                else:
-                    self.seconds = 0  # 음수일 때 0초로 돌려줌
-        self.update_display()
+        self.timer.adjust(amount, unit)
+
+    def timer_adjusted(self):
+        self.frame_pipeline.invalidate()  # 미리 그린 다음 프레임들은 조정 전 값 기준이므로 버림
+        self.request_render()
 
     # 카운트다운이 0초가 되었을 때 깜빡이게 설정
-    def blink_timer(self, blink_count=5):
-        if blink_count > 0:
+    def blink_timer(self, covered):
+        if covered:
             # 전체 타이머 캔버스를 배경색으로 덮어 깜빡이게 하는 방법
-            self.timer_canvas.create_rectangle(0, 0, self.timer_canvas.winfo_width(), self.timer_canvas.winfo_height(), fill=self.bg_color, outline=self.bg_color)
-            
-            # 0.5초 후 타이머 다시 표시
-            self.root.after(500, self.update_display)
-
-            # 1초 후에 다음 깜빡임을 처리
-            self.root.after(1000, self.blink_timer, blink_count - 1)
+            self.timer_canvas.coords(self.blink_item, 0, 0, self.timer_canvas.winfo_width(), self.timer_canvas.winfo_height())
+            self.timer_canvas.itemconfigure(self.blink_item, fill=self.bg_color, outline=self.bg_color, state="normal")
+            self.timer_canvas.tag_raise(self.blink_item)
+            for mirror in self.mirrors:
+                mirror.set_covered(True)
         else:
-            # 깜빡임이 끝나면 타이머를 다시 정상 상태로 표시
-            self.update_display()
+            self.update_display()  # 타이머 다시 표시
 
     def toggle_football_mode(self):
-        if self.football_mode_var.get() == 1:
-            self.hours = 0  # 축구 모드에서는 시간 부분을 없애기 위해 시간값을 0으로 설정
-        self.reset_timer()
-        self.update_display()
+        self.frame_pipeline.invalidate()
+        self.timer.set_football_mode(self.football_mode_var.get() == 1)
+        self.request_render()
+        self.refresh_lap_list()
+
+    def open_schedule(self):
+        path = filedialog.askopenfilename(title="일정 파일 선택", filetypes=[("일정 파일", "*.json"), ("모든 파일", "*.*")])
+        if path:
+            self.load_schedule(path)
+
+    def load_schedule(self, path):
+        try:
+            schedule = load_schedule(path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading schedule: {e}")
+            return
+        self.schedule_path = path
+        self.frame_pipeline.invalidate()
+        self.timer.set_schedule(schedule)
+        self.football_mode_var.set(1 if self.timer.core.football_mode else 0)
+        self.request_render()
+        self.refresh_lap_list()
+
+    def clear_schedule(self):
+        if self.timer.schedule is None:
+            return
+        self.schedule_path = None
+        self.frame_pipeline.invalidate()
+        self.timer.set_schedule(None)
+        self.request_render()
+        self.refresh_lap_list()
+
+    def show_segment(self, index):
+        # 일정의 현재 구간 이름을 타이머 위에 표시 (구간이 바뀔 때만 호출됨)
+        if index is None:
+            self.timer_canvas.itemconfigure(self.segment_item, state="hidden")
+            return
+        self.timer_canvas.itemconfigure(self.segment_item, text=self.timer.schedule.label(index), fill=self.fg_color, state="normal")
+        self.timer_canvas.coords(self.segment_item, self.timer_canvas.winfo_width() // 2, 6)
+
+    def open_multi_timer(self):
+        # 현재 글꼴/색/테두리 설정을 작은 크기로 가져와 여러 타이머 창을 엶
+        style = self.get_renderer().style._replace(font_size=32)
+        MultiTimerWindow(self.root, style, self.bg_color)
+
+    def poll_control_commands(self):
+        # 제어 서버가 받은 명령은 Tk 스레드에서 버튼을 누른 것과 똑같이 실행
+        try:
+            while True:
+                command, args = self.control_queue.get_nowait()
+                if command == "start_stopwatch":
+                    self.timer.run(1)
+                elif command == "start_countdown":
+                    self.timer.run(-1)
+                elif command == "resume":
+                    self.timer.run(self.timer.core.tick_direction)
+                elif command in ("stop", "pause"):
+                    self.stop_timer()
+                    self.request_render()
+                elif command == "reset":
+                    self.reset_timer()
+                elif command == "lap":
+                    self.record_lap()
+                elif command == "adjust" and len(args) == 2 and args[1] in ('hours', 'minutes', 'seconds'):
+                    try:
+                        self.adjust_time(int(args[0]), args[1])
+                    except ValueError:
+                        pass  # 잘못된 값이 입력된 경우 무시
+        except queue.Empty:
+            pass
+        self.root.after(20, self.poll_control_commands)
+
+    def enable_metrics(self, show=True):
+        if self.metrics is None:
+            self.metrics = TickMetrics(self.metrics_log)
+            self.timer.metrics = self.metrics
+            self.metrics_task = self.root.after(self.metrics_interval, self.refresh_metrics)
+        self.timer_canvas.itemconfigure(self.metrics_item, fill=self.fg_color, state="normal" if show else "hidden")
+        self.timer_canvas.tag_raise(self.metrics_item)
+
+    def toggle_metrics(self, event=None):
+        if self.timer_canvas.itemcget(self.metrics_item, "state") == "hidden":
+            self.enable_metrics()
+            self.refresh_metrics(reschedule=False)
+            return
+        self.timer_canvas.itemconfigure(self.metrics_item, state="hidden")
+        if not self.metrics_log:
+            # 파일 기록도 없으면 측정을 완전히 끔
+            self.root.after_cancel(self.metrics_task)
+            self.metrics_task = None
+            self.metrics.close()
+            self.metrics = None
+            self.timer.metrics = None
+
+    def refresh_metrics(self, reschedule=True):
+        # 1초에 한 번 화면 표시를 갱신하고 파일에 스냅샷 한 줄을 씀
+        if self.metrics is None:
+            return
+        if self.timer_canvas.itemcget(self.metrics_item, "state") != "hidden":
+            self.timer_canvas.itemconfigure(self.metrics_item, text=self.metrics.overlay_text(self.timer.dropped_frames))
+        if reschedule:
+            self.metrics.write_snapshot(self.timer.dropped_frames)
+            self.metrics_task = self.root.after(self.metrics_interval, self.refresh_metrics)
 
     def on_closing(self):
         # 프로그램이 종료될 때 타이머 스레드를 정상적으로 종료
         self.stop_event.set()
+        if self.metrics is not None:
+            self.metrics.close()
+        if self.journal is not None:
+            self.timer.shutdown()  # 정상 종료 기록 (다음 실행은 멈춘 상태로 이 값에서 시작)
+            self.journal.close()
+        if self.state_lock is not None:
+            os.close(self.state_lock)
+        if self.control_server:
+            self.control_server.close()
         self.root.destroy()
 
-root = tk.Tk()
-app = TimerApp(root)
-root.configure(bg="#A9A9A9")  # 배경색 설정
-root.mainloop()
+DEFAULT_FRAME_SIZE = "1280x720"
+
+def style_from_args(args, text):
+    # 명령줄 설정으로 화면 없는 출력용 스타일을 만듦 (글자 크기가 없으면 해상도에 맞춤)
+    font_path = args.font or get_font_path_from_registry("arial")
+    width, height = (int(n) for n in (args.size or DEFAULT_FRAME_SIZE).lower().split("x"))
+    font_size = args.font_size or fit_font_size(font_path, args.thickness, text_shape(text), int(width * 0.9), int(height * 0.9))
+    return TimerStyle(font_path, font_size, args.fill, args.outline, args.thickness,
+                      football_mode=args.football, outline_mode=args.outline_mode, size=(width, height), decimals=args.decimals)
+
+def run_frame_stream(args):
+    style = style_from_args(args, format_time(args.start, args.football, args.decimals))
+
+    core = TimerCore(args.football)
+    core.set_total_seconds(args.start)
+    core.start(-1 if args.countdown else 1)
+    streamer = FrameStreamer(open_frame_output(args.stream), style, args.stream_fps)
+    streamer.run(core, args.stream_duration)
+    # 표준 출력은 프레임을 쓰는 곳일 수 있으므로 요약은 표준 오류로
+    print(f"{streamer.frames_written} frames written, {streamer.frames_late} late (caught up)", file=sys.stderr)
+
+def run_render_sequence(args):
+    end = args.end if args.end is not None else (0 if args.countdown else args.start)
+    if args.start < 0 or end < 0 or args.step <= 0:
+        print("--start, --end는 0 이상, --step은 0보다 커야 합니다.")
+        return
+    if args.countdown and end > args.start:
+        print("--countdown이면 --end가 --start보다 작아야 합니다.")
+        return
+    direction = -1 if end < args.start else 1  # 진행 방향은 --start에서 --end 쪽
+    count = int(abs(end - args.start) / args.step + 1e-9) + 1
+    values = [max(0, args.start + direction * index * args.step) for index in range(count)]
+    longest = max((format_time(value, args.football, args.decimals) for value in (values[0], values[-1])), key=len)
+    style = style_from_args(args, longest)
+    if args.size is None:
+        # 해상도를 정하지 않았으면 글자 크기는 기본 해상도에 맞추되, 그리는 면은 가장 긴 글자에 딱 맞춤 (투명한 여백을 인코딩하지 않음)
+        thickness = style.thickness if style.outline_enabled else 0
+        style = style._replace(size=measure_text(style.font_path, style.font_size, thickness, text_shape(longest)))
+
+    start = time.perf_counter()
+    try:
+        rendered = render_sequence(args.render_sequence, style, values, args.format, args.step, args.workers)
+    except ValueError as e:
+        print(e)
+        return
+    print(f"{len(values)} frames ({rendered} rendered) in {time.perf_counter() - start:.2f}s -> {args.render_sequence}")
+
+def run_startup_probe():
+    # --benchmark-startup이 띄우는 자식 프로세스: 각 단계가 끝날 때마다 표준 출력에 한 줄씩 알림
+    root = tk.Tk()
+    app = TimerApp(root)
+    root.update()  # 창을 띄우고 첫 프레임(Tk 글꼴)을 그림
+    print("first_frame", flush=True)
+    deadline = time.perf_counter() + 5
+    while app.cell_renderer is None and time.perf_counter() < deadline:
+        root.update()  # idle 때 폰트를 찾고 테두리 글자를 그림
+    print("outlined_frame", flush=True)
+    app.on_closing()
+
+def benchmark_startup(runs=5, target_ms=150):
+    """
+    새 프로세스로 창을 띄워 첫 프레임과 테두리 글자 프레임이 그려질 때까지 걸린 시간(인터프리터 시작 포함)을 잽니다.
+    """
+    import subprocess
+    results = []
+    for run in range(runs):
+        start = time.perf_counter()
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--startup-probe"], stdout=subprocess.PIPE, text=True)
+        marks = {}
+        for line in child.stdout:
+            marks[line.strip()] = (time.perf_counter() - start) * 1000
+        child.wait()
+        if "first_frame" not in marks:
+            print(f"run {run + 1}: 창을 띄우지 못했습니다 (exit {child.returncode})")
+            return
+        results.append(marks)
+        print(f"run {run + 1}: first frame {marks['first_frame']:.0f} ms, outlined frame {marks.get('outlined_frame', float('nan')):.0f} ms")
+
+    first = sorted(marks['first_frame'] for marks in results)[len(results) // 2]
+    print(f"median first frame: {first:.0f} ms (target {target_ms} ms: {'OK' if first < target_ms else 'over'})")
+
+def main():
+    parser = argparse.ArgumentParser(description="스탑워치 및 카운트다운용 타이머")
+    parser.add_argument("--benchmark", action="store_true", help="화면 없이 렌더러의 fps와 메모리 사용량을 측정합니다.")
+    parser.add_argument("--benchmark-outline", action="store_true", help="외곽선 그리기 방식별 속도를 비교합니다.")
+    parser.add_argument("--benchmark-startup", action="store_true", help="창을 띄워 첫 프레임까지 걸리는 시간을 잽니다 (목표 150ms).")
+    parser.add_argument("--soak", type=int, nargs="?", const=20000, metavar="FRAMES", help="프레임을 계속 그리면서 메모리와 Tk 이미지 수가 늘지 않는지 확인합니다 (기본 20000프레임).")
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--simulate", type=float, nargs="?", const=24, metavar="HOURS", help="가상 시계로 타이머 동작(틱, 정지, 길게 누르기, 축구 모드, 카운트다운)을 재현하고 초당 틱 처리량을 잽니다 (기본 24시간).")
+    parser.add_argument("--font", help="벤치마크나 스트리밍에 사용할 폰트 파일 경로")
+    parser.add_argument("--outline-mode", choices=OUTLINE_MODES, default="stroke", help="외곽선 그리기 방식 (기본 stroke, --benchmark-outline으로 비교)")
+    parser.add_argument("--load-test-control", type=int, nargs="?", const=1000, metavar="N", help="제어 서버에 구독자 N개(기본 1000)를 붙여 모든 틱이 전달되는지와 지연을 잽니다.")
+    parser.add_argument("--control", metavar="ADDRESS", help="제어 서버 주소 (예: unix:/tmp/timer.sock 또는 127.0.0.1:8765)")
+    parser.add_argument("--metrics", action="store_true", help="틱/그리기 성능 표시를 켠 채로 시작합니다 (F3으로 전환).")
+    parser.add_argument("--state-dir", metavar="DIR", help="설정과 타이머 상태 저널을 저장할 폴더 (기본: 사용자 설정 폴더)")
+    parser.add_argument("--no-resume", action="store_true", help="지난 실행의 설정과 타이머 상태를 저장하거나 되살리지 않습니다.")
+    parser.add_argument("--metrics-log", metavar="PATH", help="틱/그리기 성능 스냅샷을 1초마다 JSON Lines 파일에 덧붙입니다.")
+    parser.add_argument("--schedule", metavar="PATH", help="구간 일정 파일(JSON)을 불러온 채로 시작합니다 (경기 전후반, 하프타임, 인터벌 운동 등).")
+
+    stream = parser.add_argument_group("화면 없이 출력 (RGBA 스트리밍, 일괄 렌더링)")
+    stream.add_argument("--stream", metavar="TARGET", help='프레임을 쓸 곳: "-"(표준 출력), "fd:번호", 파일 또는 named pipe 경로')
+    stream.add_argument("--check-stream", action="store_true", help="스트리밍 출력을 읽는 쪽에 연결해 프레임 수, 타이밍, 내용과 파일 덮어쓰기를 확인합니다.")
+    stream.add_argument("--render-sequence", metavar="OUTPUT", help="--start부터 --end까지의 프레임을 PNG 폴더(또는 --format apng이면 파일 하나)로 저장")
+    stream.add_argument("--end", type=int, help="일괄 렌더링의 마지막 시간(초)")
+    stream.add_argument("--step", type=float, default=1.0, help="일괄 렌더링의 프레임 간격(초, 기본 1)")
+    stream.add_argument("--format", choices=("png", "apng"), default="png", help="일괄 렌더링 저장 형식")
+    stream.add_argument("--workers", type=int, help="일괄 렌더링 작업 프로세스 수 (기본: CPU 수)")
+    stream.add_argument("--size", "--stream-size", dest="size", help="프레임 해상도 (스트리밍 기본 1280x720, 일괄 렌더링 기본은 글자에 맞춘 크기)")
+    stream.add_argument("--stream-fps", type=int, default=30, help="초당 프레임 수 (기본 30)")
+    stream.add_argument("--stream-duration", type=float, help="스트리밍할 시간(초). 없으면 읽는 쪽이 닫을 때까지")
+    stream.add_argument("--countdown", action="store_true", help="스탑워치 대신 카운트다운으로 진행")
+    stream.add_argument("--start", type=int, default=0, help="시작 시간(초)")
+    stream.add_argument("--football", action="store_true", help="축구용 타이머 형식(MM:SS)으로 표시")
+    stream.add_argument("--decimals", type=int, choices=(0, 1, 2), default=0, help="초 아래 표시 자릿수")
+    stream.add_argument("--font-size", type=int, help="글자 크기. 없으면 해상도에 맞춤")
+    stream.add_argument("--fill", default="black", help="글자 색")
+    stream.add_argument("--outline", default="white", help="테두리 색")
+    stream.add_argument("--thickness", type=int, default=2, help="테두리 두께")
+    args = parser.parse_args()
+
+    if args.check_stream:
+        if not check_stream(args.font or get_font_path_from_registry("arial")):
+            sys.exit(1)
+        return
+    if args.stream:
+        run_frame_stream(args)
+        return
+    if args.render_sequence:
+        run_render_sequence(args)
+        return
+
+    if args.benchmark:
+        benchmark_renderer(args.font or get_font_path_from_registry("arial"))
+        return
+    if args.benchmark_outline:
+        benchmark_outline_modes(args.font or get_font_path_from_registry("arial"))
+        return
+    if args.soak:
+        if not soak_renderer(args.font or get_font_path_from_registry("arial"), args.soak):
+            sys.exit(1)
+        return
+    if args.load_test_control:
+        if not load_test_control(args.load_test_control):
+            sys.exit(1)
+        return
+    if args.benchmark_startup:
+        benchmark_startup()
+        return
+    if args.startup_probe:
+        run_startup_probe()
+        return
+    if args.simulate:
+        for key, value in simulate_timer(args.simulate, args.decimals).items():
+            print(f"{key:>20}: {value:.3f}" if isinstance(value, float) else f"{key:>20}: {value}")
+        return
+
+    root = tk.Tk()
+    state_dir = None if args.no_resume else (args.state_dir or get_config_dir())
+    app = TimerApp(root, control_address=args.control, metrics_log=args.metrics_log, show_metrics=args.metrics, state_dir=state_dir,
+                   outline_mode=args.outline_mode)
+    if args.schedule:
+        app.load_schedule(args.schedule)
+    root.configure(bg="#A9A9A9")  # 배경색 설정
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()